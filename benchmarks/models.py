@@ -0,0 +1,64 @@
+"""Representative models used by the benchmarks."""
+import datetime
+import uuid
+
+import marshmallow
+from marshmallow import fields as marshmallow_fields
+
+import queue_messaging
+from queue_messaging.data import fields
+
+
+class FancyEventSchema(marshmallow.Schema):
+    uuid_field = marshmallow_fields.UUID(required=True)
+    string_field = marshmallow_fields.String(required=False)
+    created_at = marshmallow_fields.DateTime(required=True)
+    counter = marshmallow_fields.Integer(required=True)
+
+
+class FancyEvent(queue_messaging.Model):
+    class Meta:
+        schema = FancyEventSchema
+        type_name = 'FancyEvent'
+
+
+class DevicePresenceSchema(marshmallow.Schema):
+    device_mac = fields.MACAddressField(required=True)
+    access_point_mac = fields.MACAddressField(required=True)
+    gateway_mac = fields.MACAddressField(required=True)
+    neighbour_macs = marshmallow_fields.List(fields.MACAddressField(), required=True)
+    online = marshmallow_fields.Boolean(required=True)
+
+
+class DevicePresence(queue_messaging.Model):
+    class Meta:
+        schema = DevicePresenceSchema
+        type_name = 'DevicePresence'
+
+
+MODELS = [FancyEvent, DevicePresence]
+
+
+def fancy_event_fields():
+    return {
+        'uuid_field': uuid.UUID('cd1d3a03-7b04-4a35-97f8-ee5f3eb04c8e'),
+        'string_field': 'Just testing!',
+        'created_at': datetime.datetime(2016, 12, 10, 11, 15, 45, tzinfo=datetime.timezone.utc),
+        'counter': 42,
+    }
+
+
+def device_presence_fields():
+    return {
+        'device_mac': '78-F8-82-B2-E5-5A',
+        'access_point_mac': '00:1b:77:49:54:fd',
+        'gateway_mac': '001B774954FE',
+        'neighbour_macs': ['78:f8:82:b2:e5:{:02x}'.format(i) for i in range(4)],
+        'online': True,
+    }
+
+
+SAMPLES = [
+    (FancyEvent, fancy_event_fields),
+    (DevicePresence, device_presence_fields),
+]
@@ -0,0 +1,61 @@
+"""Per-publish overhead of PubSub.send, excluding the network.
+
+The publisher client is replaced with a stub that only builds resource
+paths like the real one, so the numbers show what the library itself
+adds to every publish.
+
+    python -m benchmarks.publish_overhead
+"""
+import argparse
+import timeit
+
+from google.cloud import pubsub as google_pubsub
+
+from queue_messaging.services import pubsub
+
+
+class StubPublisher:
+    topic_path = staticmethod(google_pubsub.PublisherClient.topic_path)
+
+    @staticmethod
+    def publish(topic, data, **attributes):
+        return None
+
+
+class StubPool:
+    def get_publisher(self, *args):
+        return StubPublisher()
+
+
+def create_client():
+    client = pubsub.Client(pool=StubPool())
+    return pubsub.PubSub(topic_name='benchmark-topic', project_id='benchmark-project',
+                         client=client)
+
+
+def send_with_cached_path(client):
+    client.send(b'{"field": "value"}', type='Benchmark')
+
+
+def send_rebuilding_path(client):
+    client.topic_name = client.topic_name
+    client.send(b'{"field": "value"}', type='Benchmark')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    client = create_client()
+    for name, function in [
+        ('rebuilding topic path', send_rebuilding_path),
+        ('cached topic path', send_with_cached_path),
+    ]:
+        best = min(timeit.repeat(
+            lambda: function(client), number=args.number, repeat=args.repeat))
+        print('{:<24} {:8.3f} us/publish'.format(name, best / args.number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
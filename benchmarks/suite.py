@@ -0,0 +1,222 @@
+"""Throughput and latency of the encode, decode, send and receive paths.
+
+Every stage runs for each representative model. Each operation is timed
+separately, giving messages per second together with p50 and p99
+latencies. Send and receive stages run against the in-process broker,
+so no network is involved.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --compare results.json --max-regression 10
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import time
+import types
+import uuid
+
+from queue_messaging import messaging
+from queue_messaging.data import encoding
+from queue_messaging.services import memory
+from queue_messaging.services import pubsub
+
+from benchmarks import models
+
+
+def measure(operation, number):
+    """Call `operation(i)` `number` times, returning the latencies in seconds."""
+    latencies = []
+    clock = time.perf_counter
+    for i in range(number):
+        start = clock()
+        operation(i)
+        latencies.append(clock() - start)
+    return latencies
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[int(round(fraction * (len(sorted_values) - 1)))]
+
+
+def summarize(latencies, elapsed=None):
+    """Summarize latencies; throughput is based on `elapsed` when given."""
+    latencies = sorted(latencies)
+    if elapsed is None:
+        elapsed = sum(latencies)
+    return {
+        'count': len(latencies),
+        'messages_per_second': len(latencies) / elapsed if elapsed else None,
+        'p50_us': percentile(latencies, 0.5) * 1e6,
+        'p99_us': percentile(latencies, 0.99) * 1e6,
+    }
+
+
+def create_messaging(broker):
+    topic = 'benchmark-topic-{}'.format(uuid.uuid4())
+    subscription = 'benchmark-subscription-{}'.format(uuid.uuid4())
+    broker.create_subscription(subscription, topic)
+    client = memory.Memory(topic_name=topic, subscription_name=subscription, broker=broker)
+    dead_letter_client = memory.Memory(topic_name='benchmark-dead-letter', broker=broker)
+    type_to_model = messaging.Messaging._create_type_mapping(models.MODELS)
+    return messaging.Messaging(client, dead_letter_client, type_to_model)
+
+
+def get_stages(model_class, get_fields, number):
+    """Return `(stage, run)` pairs, `run()` returning a result summary."""
+    type_to_model = {model_class.Meta.type_name: model_class}
+    model_fields = get_fields()
+    model = model_class(**model_fields)
+    data = encoding.encode(model)
+    attributes = encoding.create_attributes(model)
+    header = encoding.create_header(attributes)
+    google_message = types.SimpleNamespace(
+        data=data, message_id='1', attributes=attributes,
+        ack=lambda: None, nack=lambda: None, modify_ack_deadline=lambda seconds: None)
+
+    def single(operation):
+        return lambda: summarize(measure(operation, number))
+
+    return [
+        ('model_init', single(lambda i: model_class(**model_fields))),
+        ('encode', single(lambda i: encoding.encode(model))),
+        ('create_attributes', single(lambda i: encoding.create_attributes(model))),
+        ('create_header', single(lambda i: encoding.create_header(attributes))),
+        ('decode', single(lambda i: encoding.decode_payload(header, data, type_to_model))),
+        ('process_message', single(lambda i: pubsub.PubSub.process_message(
+            google_message, lambda message: None))),
+        ('send', lambda: run_send(model, number)),
+        ('receive', lambda: run_receive(model, number)),
+        ('end_to_end', lambda: run_end_to_end(model, number)),
+    ]
+
+
+def run_send(model, number):
+    messaging_instance = create_messaging(memory.Broker())
+    result = summarize(measure(lambda i: messaging_instance.send(model), number))
+    messaging_instance.flush()
+    return result
+
+
+def run_receive(model, number):
+    """Pull, decode and acknowledge messages one by one."""
+    messaging_instance = create_messaging(memory.Broker())
+    for _ in range(number):
+        messaging_instance.send(model)
+    messaging_instance.flush()
+
+    def receive_one(i):
+        for envelope in messaging_instance.pull(1, timeout=1):
+            envelope.model
+            envelope.acknowledge()
+
+    return summarize(measure(receive_one, number))
+
+
+def run_end_to_end(model, number, batch_size=100):
+    """Send and receive messages in batches of `batch_size`.
+
+    Latency is measured from the header timestamp, set when the message
+    was sent, to the moment its model was decoded; throughput is the
+    number of messages over the whole run time.
+    """
+    messaging_instance = create_messaging(memory.Broker())
+    latencies = []
+    started = time.perf_counter()
+    for start in range(0, number, batch_size):
+        count = min(batch_size, number - start)
+        for _ in range(count):
+            messaging_instance.send(model)
+        received = 0
+        while received < count:
+            for envelope in messaging_instance.pull(count - received, timeout=1):
+                envelope.model
+                now = datetime.datetime.now(datetime.timezone.utc)
+                latencies.append((now - envelope.header.timestamp).total_seconds())
+                envelope.acknowledge()
+                received += 1
+    return summarize(latencies, elapsed=time.perf_counter() - started)
+
+
+def run(number, stage_filter=None):
+    results = {}
+    for model_class, get_fields in models.SAMPLES:
+        for stage, run_stage in get_stages(model_class, get_fields, number):
+            name = '{}.{}'.format(stage, model_class.Meta.type_name)
+            if stage_filter and not any(part in name for part in stage_filter):
+                continue
+            results[name] = run_stage()
+    return results
+
+
+def get_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+        ).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_results):
+    """Return `(name, change)` pairs, change being the relative throughput change."""
+    changes = []
+    for name, result in sorted(results.items()):
+        baseline = baseline_results.get(name)
+        if baseline is None or not baseline['messages_per_second']:
+            continue
+        change = result['messages_per_second'] / baseline['messages_per_second'] - 1
+        changes.append((name, change))
+    return changes
+
+
+def print_results(results):
+    print('{:<34} {:>14} {:>10} {:>10}'.format('stage', 'messages/s', 'p50 us', 'p99 us'))
+    for name, result in sorted(results.items()):
+        print('{:<34} {:>14.0f} {:>10.2f} {:>10.2f}'.format(
+            name, result['messages_per_second'], result['p50_us'], result['p99_us']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=10000,
+                        help='operations per stage and model')
+    parser.add_argument('--stage', action='append',
+                        help='only run stages whose name contains this, can be repeated')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare with')
+    parser.add_argument('--max-regression', type=float,
+                        help='exit with an error when throughput of a stage dropped by '
+                             'more than this many percent against --compare')
+    args = parser.parse_args(argv)
+
+    results = run(args.number, args.stage)
+    print_results(results)
+    report = {
+        'revision': get_revision(),
+        'python': platform.python_version(),
+        'number': args.number,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        print('\nCompared with {}:'.format(baseline.get('revision') or args.compare))
+        regressions = []
+        for name, change in compare(results, baseline['results']):
+            print('{:<34} {:>+9.1f}%'.format(name, change * 100))
+            if args.max_regression is not None and -change * 100 > args.max_regression:
+                regressions.append(name)
+        if regressions:
+            print('\nRegressed: {}'.format(', '.join(regressions)))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
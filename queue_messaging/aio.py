@@ -0,0 +1,90 @@
+import asyncio
+import logging
+
+from queue_messaging import utils
+from queue_messaging.messaging import Messaging
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 100
+
+
+class AsyncEnvelope:
+    def __init__(self, envelope, loop):
+        self._envelope = envelope
+        self._loop = loop
+
+    @property
+    def model(self):
+        return self._envelope.model
+
+    @property
+    def header(self):
+        return self._envelope.header
+
+    async def acknowledge(self):
+        self._envelope.acknowledge()
+
+    async def nack(self):
+        self._envelope.nack()
+
+    async def extend(self, seconds):
+        self._envelope.extend(seconds)
+
+    async def mark_as_dead_letter(self):
+        future = self._envelope.mark_as_dead_letter()
+        return await utils.wrap_in_asyncio_future(future, self._loop)
+
+
+class AsyncMessaging:
+    """asyncio counterpart of `Messaging`.
+
+    Publishing returns awaitables wrapping the publisher futures. Received
+    messages are handed from the client threads straight to the event
+    loop, where async handlers run with at most `max_concurrency` of them
+    in progress at once.
+    """
+    def __init__(self, messaging, loop=None, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self._messaging = messaging
+        self._loop = loop
+        self._max_concurrency = max_concurrency
+
+    @classmethod
+    def create_from_dict(cls, dict, loop=None, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        return cls(Messaging.create_from_dict(dict), loop=loop, max_concurrency=max_concurrency)
+
+    @property
+    def loop(self):
+        return self._loop or asyncio.get_event_loop()
+
+    def send(self, model):
+        return utils.wrap_in_asyncio_future(self._messaging.send(model), self.loop)
+
+    def send_many(self, models):
+        return utils.wrap_in_asyncio_future(self._messaging.send_many(models), self.loop)
+
+    async def flush(self, timeout=None):
+        await self.loop.run_in_executor(None, self._messaging.flush, timeout)
+
+    async def receive(self, handler):
+        loop = self.loop
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def handle(envelope):
+            async with semaphore:
+                try:
+                    await handler(AsyncEnvelope(envelope, loop))
+                except Exception:
+                    logger.exception('Error in async message handler')
+                    envelope.nack()
+
+        def callback(envelope):
+            return asyncio.run_coroutine_threadsafe(handle(envelope), loop)
+
+        streaming_future = self._messaging.subscribe(callback)
+        try:
+            await utils.wrap_in_asyncio_future(streaming_future, loop)
+        except asyncio.CancelledError:
+            streaming_future.cancel()
+            raise
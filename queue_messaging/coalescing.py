@@ -0,0 +1,80 @@
+import concurrent.futures
+import threading
+
+from queue_messaging.utils import scheduling
+
+
+def get_key(model):
+    """Return the coalescing key of `model`, or None if it has none.
+
+    Models opt in with the name of the field identifying superseded
+    messages in ``Meta.coalesce_key``.
+    """
+    field_name = getattr(model.Meta, 'coalesce_key', None)
+    if field_name is None:
+        return None
+    return model.Meta.type_name, getattr(model, field_name)
+
+
+class Coalescer:
+    """Publishes only the latest model per key sent within `window` seconds.
+
+    The window of a key starts with its first model. Futures returned for
+    superseded models resolve with the result of the publish that replaced
+    them. Publishes run on the coalescer's own scheduler thread, as they may
+    block on publisher flow control until a retry on the shared scheduler
+    frees a slot.
+    """
+    def __init__(self, window, publish, scheduler=None):
+        self.window = window
+        self._publish = publish
+        self._scheduler = scheduler or scheduling.Scheduler(name='queue-messaging-coalescer')
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def add(self, key, model):
+        future = concurrent.futures.Future()
+        future.set_running_or_notify_cancel()
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                self._pending[key] = [model, [future]]
+                schedule = True
+            else:
+                entry[0] = model
+                entry[1].append(future)
+                schedule = False
+        if schedule:
+            self._scheduler.schedule(self.window, lambda: self.flush_key(key))
+        return future
+
+    def flush(self):
+        with self._lock:
+            keys = list(self._pending)
+        for key in keys:
+            self.flush_key(key)
+
+    def flush_key(self, key):
+        with self._lock:
+            entry = self._pending.pop(key, None)
+        if entry is None:
+            return
+        model, futures = entry
+        try:
+            publish_future = self._publish(model)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        publish_future.add_done_callback(lambda _: self._resolve(publish_future, futures))
+
+    @staticmethod
+    def _resolve(publish_future, futures):
+        try:
+            result = publish_future.result()
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+        else:
+            for future in futures:
+                future.set_result(result)
@@ -1,10 +1,27 @@
 from collections import namedtuple
 
+from queue_messaging import dead_letter
+from queue_messaging import dedup
+from queue_messaging import dispatching
+from queue_messaging import outbox
+from queue_messaging import publishing
+from queue_messaging.data import compression
+
 
 Configuration = namedtuple(
     'Configuration',
     ['TOPIC', 'SUBSCRIPTION', 'DEAD_LETTER_TOPIC', 'PUBSUB_EMULATOR_HOST',
-     'MESSAGE_TYPES', 'PROJECT_ID'],
+     'MESSAGE_TYPES', 'PROJECT_ID', 'PUBLISH_BATCH_MAX_MESSAGES',
+     'PUBLISH_BATCH_MAX_BYTES', 'PUBLISH_BATCH_MAX_LATENCY', 'JSON_ENGINE',
+     'CONTENT_TYPE', 'COMPRESSION', 'COMPRESSION_THRESHOLD',
+     'UNHANDLED_MESSAGE_POLICY', 'CONSUMER_MAX_WORKERS', 'CONSUMER_MAX_MESSAGES',
+     'CONSUMER_MAX_BYTES', 'CONSUMER_PROCESSES', 'DEAD_LETTER_MAX_IN_FLIGHT',
+     'CONSUMER_MAX_LEASE_DURATION', 'CREDENTIALS', 'PUBLISH_RETRY_MAX_ATTEMPTS',
+     'PUBLISH_RETRY_INITIAL_DELAY', 'PUBLISH_RETRY_MAX_DELAY', 'PUBLISH_RETRY_BUDGET_RATIO',
+     'OUTBOX_PATH', 'OUTBOX_BATCH_SIZE', 'OUTBOX_DRAIN_INTERVAL',
+     'PUBLISH_MAX_OUTSTANDING_MESSAGES', 'PUBLISH_MAX_OUTSTANDING_BYTES', 'PUBLISH_OVERFLOW',
+     'BACKEND', 'DEDUP_CACHE_SIZE', 'DEDUP_TTL', 'DEDUP_PATH',
+     'COALESCE_WINDOW'],
 )
 
 
@@ -20,4 +37,34 @@ class Factory:
             self.config_dict.get('PUBSUB_EMULATOR_HOST'),
             self.config_dict.get('MESSAGE_TYPES', []),
             self.config_dict.get('PROJECT_ID'),
+            self.config_dict.get('PUBLISH_BATCH_MAX_MESSAGES'),
+            self.config_dict.get('PUBLISH_BATCH_MAX_BYTES'),
+            self.config_dict.get('PUBLISH_BATCH_MAX_LATENCY'),
+            self.config_dict.get('JSON_ENGINE'),
+            self.config_dict.get('CONTENT_TYPE'),
+            self.config_dict.get('COMPRESSION'),
+            self.config_dict.get('COMPRESSION_THRESHOLD', compression.DEFAULT_THRESHOLD),
+            self.config_dict.get('UNHANDLED_MESSAGE_POLICY', dispatching.ACKNOWLEDGE),
+            self.config_dict.get('CONSUMER_MAX_WORKERS'),
+            self.config_dict.get('CONSUMER_MAX_MESSAGES'),
+            self.config_dict.get('CONSUMER_MAX_BYTES'),
+            self.config_dict.get('CONSUMER_PROCESSES'),
+            self.config_dict.get('DEAD_LETTER_MAX_IN_FLIGHT', dead_letter.DEFAULT_MAX_IN_FLIGHT),
+            self.config_dict.get('CONSUMER_MAX_LEASE_DURATION'),
+            self.config_dict.get('CREDENTIALS'),
+            self.config_dict.get('PUBLISH_RETRY_MAX_ATTEMPTS'),
+            self.config_dict.get('PUBLISH_RETRY_INITIAL_DELAY'),
+            self.config_dict.get('PUBLISH_RETRY_MAX_DELAY'),
+            self.config_dict.get('PUBLISH_RETRY_BUDGET_RATIO'),
+            self.config_dict.get('OUTBOX_PATH'),
+            self.config_dict.get('OUTBOX_BATCH_SIZE', outbox.DEFAULT_BATCH_SIZE),
+            self.config_dict.get('OUTBOX_DRAIN_INTERVAL', outbox.DEFAULT_DRAIN_INTERVAL),
+            self.config_dict.get('PUBLISH_MAX_OUTSTANDING_MESSAGES'),
+            self.config_dict.get('PUBLISH_MAX_OUTSTANDING_BYTES'),
+            self.config_dict.get('PUBLISH_OVERFLOW', publishing.BLOCK),
+            self.config_dict.get('BACKEND', 'pubsub'),
+            self.config_dict.get('DEDUP_CACHE_SIZE'),
+            self.config_dict.get('DEDUP_TTL', dedup.DEFAULT_TTL),
+            self.config_dict.get('DEDUP_PATH'),
+            self.config_dict.get('COALESCE_WINDOW'),
         )
@@ -0,0 +1,51 @@
+import concurrent.futures
+import concurrent.futures.process
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessPoolHandler:
+    """Callback running CPU heavy handlers in a pool of worker processes.
+
+    Envelopes cannot leave the consumer thread, so the model is decoded
+    there and only `handler(model)` runs in a worker process. The message
+    is acknowledged once the handler returns, or rejected with
+    `Envelope.reject` when decoding or the handler fails. When a worker
+    process dies the message is nacked and the pool is replaced.
+    """
+    def __init__(self, handler, processes=None):
+        self._handler = handler
+        self._processes = processes
+        self._executor = self._create_executor()
+        self._lock = threading.Lock()
+
+    def _create_executor(self):
+        return concurrent.futures.ProcessPoolExecutor(max_workers=self._processes)
+
+    def __call__(self, envelope):
+        try:
+            model = envelope.model
+            executor = self._executor
+            executor.submit(self._handler, model).result()
+        except concurrent.futures.process.BrokenProcessPool:
+            logger.exception('Worker process died while handling a message')
+            envelope.nack()
+            self._replace_executor(executor)
+        except Exception:
+            logger.exception('Error while handling a message in a worker process')
+            envelope.reject()
+        else:
+            envelope.acknowledge()
+
+    def _replace_executor(self, broken_executor):
+        with self._lock:
+            if self._executor is not broken_executor:
+                return
+            self._executor = self._create_executor()
+        broken_executor.shutdown(wait=False)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
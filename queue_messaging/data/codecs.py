@@ -0,0 +1,103 @@
+from queue_messaging import exceptions
+from queue_messaging.data import json_engines
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover
+    cbor2 = None
+
+
+JSON_CONTENT_TYPE = 'application/json'
+MSGPACK_CONTENT_TYPE = 'application/msgpack'
+CBOR_CONTENT_TYPE = 'application/cbor'
+DEFAULT_CONTENT_TYPE = JSON_CONTENT_TYPE
+
+
+class JSONCodec:
+    content_type = JSON_CONTENT_TYPE
+
+    def __init__(self, json_engine=None):
+        self.json_engine = json_engine or json_engines.default_engine
+
+    def dumps(self, data) -> bytes:
+        return self.json_engine.dumps(data)
+
+    def loads(self, encoded_data):
+        return self.json_engine.loads(encoded_data)
+
+
+class MessagePackCodec:
+    content_type = MSGPACK_CONTENT_TYPE
+
+    @staticmethod
+    def dumps(data) -> bytes:
+        return msgpack.packb(data, use_bin_type=True)
+
+    @staticmethod
+    def loads(encoded_data):
+        try:
+            return msgpack.unpackb(encoded_data, raw=False)
+        except msgpack.exceptions.UnpackException as e:
+            raise ValueError(e)
+
+
+class CBORCodec:
+    content_type = CBOR_CONTENT_TYPE
+
+    @staticmethod
+    def dumps(data) -> bytes:
+        try:
+            return cbor2.dumps(data)
+        except cbor2.CBOREncodeError as e:
+            raise TypeError(e)
+
+    @staticmethod
+    def loads(encoded_data):
+        try:
+            return cbor2.loads(encoded_data)
+        except cbor2.CBORDecodeError as e:
+            raise ValueError(e)
+
+
+BINARY_CODECS = {
+    MSGPACK_CONTENT_TYPE: (MessagePackCodec, msgpack),
+    CBOR_CONTENT_TYPE: (CBORCodec, cbor2),
+}
+
+
+class Codecs:
+    """Codecs available for payloads, looked up by content type.
+
+    The JSON codec uses the configured JSON engine; binary codecs are
+    available when their library is installed.
+    """
+    def __init__(self, json_engine=None):
+        self.json = JSONCodec(json_engine)
+        self._codecs = {JSON_CONTENT_TYPE: self.json}
+        for content_type, (codec, module) in BINARY_CODECS.items():
+            if module is not None:
+                self._codecs[content_type] = codec()
+
+    def get(self, content_type):
+        if content_type is None:
+            return self.json
+        try:
+            return self._codecs[content_type]
+        except KeyError:
+            raise exceptions.DecodingError(
+                'Unsupported content type.', content_type=content_type)
+
+    def get_for_publishing(self, content_type):
+        try:
+            return self.get(content_type)
+        except exceptions.DecodingError:
+            raise exceptions.ConfigurationError(
+                'Unsupported or not installed content type: {}'.format(content_type))
+
+
+default_codecs = Codecs()
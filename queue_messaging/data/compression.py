@@ -0,0 +1,113 @@
+import zlib
+
+from queue_messaging import exceptions
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:  # pragma: no cover
+    lz4 = None
+
+
+DEFAULT_THRESHOLD = 1024
+
+
+class ZlibCompressor:
+    name = 'zlib'
+
+    @staticmethod
+    def compress(data: bytes) -> bytes:
+        return zlib.compress(data)
+
+    @staticmethod
+    def decompress(data: bytes) -> bytes:
+        try:
+            return zlib.decompress(data)
+        except zlib.error as e:
+            raise ValueError(e)
+
+
+class ZstdCompressor:
+    name = 'zstd'
+
+    @staticmethod
+    def compress(data: bytes) -> bytes:
+        return zstandard.ZstdCompressor().compress(data)
+
+    @staticmethod
+    def decompress(data: bytes) -> bytes:
+        try:
+            return zstandard.ZstdDecompressor().decompress(data)
+        except zstandard.ZstdError as e:
+            raise ValueError(e)
+
+
+class Lz4Compressor:
+    name = 'lz4'
+
+    @staticmethod
+    def compress(data: bytes) -> bytes:
+        return lz4.frame.compress(data)
+
+    @staticmethod
+    def decompress(data: bytes) -> bytes:
+        try:
+            return lz4.frame.decompress(data)
+        except RuntimeError as e:
+            raise ValueError(e)
+
+
+COMPRESSORS = {
+    'zlib': (ZlibCompressor, zlib),
+    'zstd': (ZstdCompressor, zstandard),
+    'lz4': (Lz4Compressor, lz4),
+}
+
+
+def get_compressor(name):
+    if name is None:
+        return None
+    try:
+        compressor, module = COMPRESSORS[name]
+    except KeyError:
+        raise exceptions.ConfigurationError(
+            'Unknown compression: {}'.format(name))
+    if module is None:
+        raise exceptions.ConfigurationError(
+            'Compression is not installed: {}'.format(name))
+    return compressor()
+
+
+def compress(payload: bytes, attributes: dict, compressor, threshold=DEFAULT_THRESHOLD):
+    """Compress payloads bigger than `threshold` bytes.
+
+    Returns the payload with its attributes, which gain a
+    ``content_encoding`` entry when the payload was compressed.
+    """
+    if compressor is None or len(payload) <= threshold:
+        return payload, attributes
+    compressed = compressor.compress(payload)
+    if len(compressed) >= len(payload):
+        return payload, attributes
+    return compressed, dict(attributes, content_encoding=compressor.name)
+
+
+def decompress(payload: bytes, content_encoding):
+    if content_encoding is None:
+        return payload
+    try:
+        compressor, module = COMPRESSORS[content_encoding]
+    except KeyError:
+        module = None
+    if module is None:
+        raise exceptions.DecodingError(
+            'Unsupported content encoding.', content_encoding=content_encoding)
+    try:
+        return compressor().decompress(payload)
+    except (ValueError, TypeError) as e:
+        raise exceptions.DecodingError(
+            'Error while decompressing.', content_encoding=content_encoding, error=e)
@@ -1,42 +1,55 @@
 import datetime
-import json
+import re
 
 import marshmallow
 
 from queue_messaging import exceptions
+from queue_messaging.data import codecs
+from queue_messaging.data import compression
+from queue_messaging.data import schemas
 from queue_messaging.data import structures
 
 
-def encode(model: structures.Model):
+def encode(model: structures.Model, codec=None) -> bytes:
+    codec = codec or codecs.default_codecs.json
     try:
-        serialization_result = model.Meta.schema().dumps(model)
+        serialization_result = schemas.get_schema(model.Meta.schema).dump(model)
     except AttributeError as e:
         raise exceptions.EncodingError(e)
     except marshmallow.ValidationError as e:
         raise exceptions.EncodingError(e.messages)
-    else:
-        if serialization_result.errors:
-            raise exceptions.EncodingError(serialization_result.errors)
-        else:
-            return serialization_result.data
+    if serialization_result.errors:
+        raise exceptions.EncodingError(serialization_result.errors)
+    try:
+        return codec.dumps(serialization_result.data)
+    except (TypeError, ValueError, OverflowError) as e:
+        raise exceptions.EncodingError(e)
 
 
-def decode_payload(header: structures.Header, encoded_data: str, message_config: dict):
+def decode_payload(header: structures.Header, encoded_data, message_config: dict,
+                   payload_codecs=None):
+    payload_codecs = payload_codecs or codecs.default_codecs
     try:
         type = message_config[header.type]
+        codec = payload_codecs.get(header.content_type)
     except AttributeError:
         raise exceptions.DecodingError('Invalid header.', header=header)
     except KeyError:
         raise exceptions.DecodingError('Unknown type.', header_type=header.type)
     else:
-        return decode(type, encoded_data)
+        encoded_data = compression.decompress(encoded_data, header.content_encoding)
+        return decode(type, encoded_data, codec=codec)
 
 
-def decode(type, encoded_data: str):
+def decode(type, encoded_data, codec=None):
+    codec = codec or codecs.default_codecs.json
     try:
-        decoded_data = type.Meta.schema().loads(encoded_data)
-    except (json.decoder.JSONDecodeError, TypeError, AttributeError):
+        schema = schemas.get_schema(type.Meta.schema)
+        data = codec.loads(encoded_data)
+    except (ValueError, TypeError, AttributeError):
         raise exceptions.DecodingError('Error while decoding.', encoded_data=encoded_data)
+    try:
+        decoded_data = schema.load(data)
     except marshmallow.ValidationError as e:
         raise exceptions.DecodingError(e.messages)
     else:
@@ -46,7 +59,8 @@ def decode(type, encoded_data: str):
             return type(**decoded_data.data)
 
 
-def create_attributes(model: structures.Model, now=None) -> dict:
+def create_attributes(model: structures.Model, now=None,
+                      content_type=codecs.DEFAULT_CONTENT_TYPE) -> dict:
     if now is None:
         now = get_now_with_utc_timezone()
     try:
@@ -58,6 +72,7 @@ def create_attributes(model: structures.Model, now=None) -> dict:
         return {
             'type': type_name,
             'timestamp': datetime_to_rfc3339_string(now),
+            'content_type': content_type,
         }
 
 
@@ -80,19 +95,66 @@ def create_header(attributes):
             timestamp=timestamp)
     return structures.Header(
         type=type,
-        timestamp=timestamp
+        timestamp=timestamp,
+        content_type=attributes.get('content_type', codecs.DEFAULT_CONTENT_TYPE),
+        content_encoding=attributes.get('content_encoding'),
     )
 
 
 RFC3339_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
 
+_RFC3339_PATTERN = re.compile(
+    r'([0-9]{4})-([0-9]{2})-([0-9]{2})T([0-9]{2}):([0-9]{2}):([0-9]{2})\.([0-9]{6})Z\Z')
+_RFC3339_FRACTION_PATTERN = re.compile(r'[0-9]{6}Z\Z')
+_RFC3339_PREFIX_LENGTH = len('2016-12-10T11:15:45.')
+
+# Timestamps of consecutive messages mostly fall within the same second, so
+# the text before the fraction is kept for the last formatted and parsed one.
+_format_cache = (None, None)
+_parse_cache = (None, None)
+
 
 def datetime_to_rfc3339_string(value: datetime.datetime):
-    if value.tzinfo is not None:
+    global _format_cache
+    if value.tzinfo is datetime.timezone.utc:
+        value = value.replace(tzinfo=None)
+    elif value.tzinfo is not None:
         value = value.replace(tzinfo=None) - value.utcoffset()
-    return value.strftime(RFC3339_FORMAT)
+    if value.year < 1000:
+        return value.strftime(RFC3339_FORMAT)
+    second = value.replace(microsecond=0)
+    cached_second, prefix = _format_cache
+    if second != cached_second:
+        prefix = second.isoformat() + '.'
+        _format_cache = (second, prefix)
+    return prefix + '%06dZ' % value.microsecond
 
 
 def rfc3339_string_to_datetime(value):
+    try:
+        parsed = _parse_rfc3339(value)
+    except (TypeError, ValueError):
+        parsed = None
+    if parsed is not None:
+        return parsed
+    # Anything out of the ordinary goes through strptime, which is the
+    # reference for what is accepted and for the error raised otherwise.
     return datetime.datetime.strptime(
         value, RFC3339_FORMAT).replace(tzinfo=datetime.timezone.utc)
+
+
+def _parse_rfc3339(value):
+    global _parse_cache
+    prefix = value[:_RFC3339_PREFIX_LENGTH]
+    cached_prefix, second = _parse_cache
+    if prefix != cached_prefix or not _RFC3339_FRACTION_PATTERN.match(
+            value, _RFC3339_PREFIX_LENGTH):
+        match = _RFC3339_PATTERN.match(value)
+        if match is None:
+            return None
+        year, month, day, hour, minute, seconds = (int(part) for part in match.groups()[:6])
+        second = datetime.datetime(
+            year, month, day, hour, minute, seconds, tzinfo=datetime.timezone.utc)
+        _parse_cache = (prefix, second)
+    return second.replace(
+        microsecond=int(value[_RFC3339_PREFIX_LENGTH:_RFC3339_PREFIX_LENGTH + 6]))
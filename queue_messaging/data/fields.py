@@ -1,19 +1,39 @@
+import functools
+import re
+
 from marshmallow import fields
 import netaddr
 
 
+# Six two digit hex octets, separated by colons, dashes or nothing.
+MAC_PATTERN = re.compile(
+    r'([0-9a-fA-F]{2})([:-]?)([0-9a-fA-F]{2})\2([0-9a-fA-F]{2})\2'
+    r'([0-9a-fA-F]{2})\2([0-9a-fA-F]{2})\2([0-9a-fA-F]{2})\Z')
+
+
 class MACAddressField(fields.Field):
+    """EUI-48 MAC address, serialized in `default_dialect`.
+
+    Common textual forms are parsed without netaddr; other input falls
+    back to `netaddr.EUI`. With `cache_size`, up to that many recently
+    parsed strings are kept in an LRU cache.
+    """
     default_error_messages = {
         'invalid': 'Not a valid MAC.',
         'format': '"{input}" cannot be formatted as MAC.',
     }
     default_dialect = netaddr.mac_unix_expanded
 
+    def __init__(self, *args, cache_size=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if cache_size:
+            self._parse = functools.lru_cache(maxsize=cache_size)(self._parse)
+
     def _serialize(self, value, attr, obj):
         if value is None:
             return None
         try:
-            return str(self._to_python(value))
+            return self._format(*self._to_value_and_version(value))
         except netaddr.AddrFormatError:
             self.fail('format', input=value)
 
@@ -26,6 +46,29 @@ class MACAddressField(fields.Field):
             self.fail('format', input=value)
 
     def _to_python(self, value):
-        eui = netaddr.EUI(value)
-        eui.dialect = self.default_dialect
-        return eui
+        if isinstance(value, netaddr.EUI) and value.dialect is self.default_dialect:
+            return value
+        mac, version = self._to_value_and_version(value)
+        return netaddr.EUI(mac, version=version, dialect=self.default_dialect)
+
+    def _to_value_and_version(self, value):
+        if isinstance(value, str):
+            return self._parse(value)
+        if not isinstance(value, netaddr.EUI):
+            value = netaddr.EUI(value)
+        return value.value, value.version
+
+    @staticmethod
+    def _parse(text):
+        match = MAC_PATTERN.match(text)
+        if match is None:
+            eui = netaddr.EUI(text)
+            return eui.value, eui.version
+        return int(''.join(match.group(1, 3, 4, 5, 6, 7)), 16), 48
+
+    def _format(self, mac, version):
+        if version == 48 and self.default_dialect is netaddr.mac_unix_expanded:
+            digits = '%012x' % mac
+            return ':'.join((
+                digits[0:2], digits[2:4], digits[4:6], digits[6:8], digits[8:10], digits[10:12]))
+        return str(netaddr.EUI(mac, version=version, dialect=self.default_dialect))
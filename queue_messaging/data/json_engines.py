@@ -0,0 +1,101 @@
+import json
+
+from queue_messaging import exceptions
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import rapidjson
+except ImportError:  # pragma: no cover
+    rapidjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+
+class StdlibEngine:
+    name = 'json'
+
+    @staticmethod
+    def dumps(data) -> bytes:
+        return json.dumps(data).encode('utf-8')
+
+    @staticmethod
+    def loads(encoded_data):
+        return json.loads(encoded_data)
+
+
+class OrjsonEngine:
+    name = 'orjson'
+
+    @staticmethod
+    def dumps(data) -> bytes:
+        return orjson.dumps(data)
+
+    @staticmethod
+    def loads(encoded_data):
+        return orjson.loads(encoded_data)
+
+
+class RapidjsonEngine:
+    name = 'rapidjson'
+
+    @staticmethod
+    def dumps(data) -> bytes:
+        return rapidjson.dumps(data).encode('utf-8')
+
+    @staticmethod
+    def loads(encoded_data):
+        return rapidjson.loads(encoded_data)
+
+
+class UjsonEngine:
+    name = 'ujson'
+
+    @staticmethod
+    def dumps(data) -> bytes:
+        return ujson.dumps(data).encode('utf-8')
+
+    @staticmethod
+    def loads(encoded_data):
+        return ujson.loads(encoded_data)
+
+
+ENGINES = {
+    'json': (StdlibEngine, json),
+    'orjson': (OrjsonEngine, orjson),
+    'rapidjson': (RapidjsonEngine, rapidjson),
+    'ujson': (UjsonEngine, ujson),
+}
+AUTO_PREFERENCE = ['orjson', 'rapidjson', 'ujson', 'json']
+
+default_engine = StdlibEngine()
+
+
+def get_engine(name=None):
+    """Return the JSON engine called `name`.
+
+    `None` selects the standard library engine, `'auto'` the fastest
+    installed one.
+    """
+    if name is None:
+        return default_engine
+    if name == 'auto':
+        return next(
+            engine() for engine, module in map(ENGINES.get, AUTO_PREFERENCE)
+            if module is not None
+        )
+    try:
+        engine, module = ENGINES[name]
+    except KeyError:
+        raise exceptions.ConfigurationError(
+            'Unknown JSON engine: {}'.format(name))
+    if module is None:
+        raise exceptions.ConfigurationError(
+            'JSON engine is not installed: {}'.format(name))
+    return engine()
@@ -0,0 +1,70 @@
+import collections
+import operator
+import threading
+
+
+SchemaFields = collections.namedtuple('SchemaFields', ['fields', 'names', 'required', 'values'])
+
+
+class Registry:
+    """Per schema class cache of schema instances and their field metadata.
+
+    Marshmallow schemas are expensive to construct but safe to reuse, so a
+    single instance is shared by every model using the same schema class.
+    """
+    def __init__(self):
+        self._schemas = {}
+        self._fields = {}
+        self._lock = threading.Lock()
+
+    def get_schema(self, schema_class):
+        try:
+            return self._schemas[schema_class]
+        except KeyError:
+            with self._lock:
+                if schema_class not in self._schemas:
+                    self._schemas[schema_class] = schema_class()
+                return self._schemas[schema_class]
+
+    def get_fields(self, schema_class) -> SchemaFields:
+        try:
+            return self._fields[schema_class]
+        except KeyError:
+            fields = self.get_schema(schema_class).fields
+            schema_fields = SchemaFields(
+                fields=fields,
+                names=frozenset(fields.keys()),
+                required=frozenset(
+                    field_name
+                    for field_name, field in fields.items()
+                    if field.required
+                ),
+                values=_create_values_getter(fields.keys()),
+            )
+            self._fields[schema_class] = schema_fields
+            return schema_fields
+
+    def register(self, model_class):
+        self.get_fields(model_class.Meta.schema)
+
+
+def _create_values_getter(field_names):
+    field_names = tuple(field_names)
+    if len(field_names) > 1:
+        return operator.attrgetter(*field_names)
+    elif field_names:
+        getter = operator.attrgetter(*field_names)
+        return lambda model: (getter(model),)
+    else:
+        return lambda model: ()
+
+
+registry = Registry()
+
+
+def get_schema(schema_class):
+    return registry.get_schema(schema_class)
+
+
+def get_fields(schema_class) -> SchemaFields:
+    return registry.get_fields(schema_class)
@@ -1,26 +1,77 @@
 import collections
 
+from queue_messaging.data import schemas
 
-Header = collections.namedtuple('Header', ['type', 'timestamp'])
 
+Header = collections.namedtuple(
+    'Header', ['type', 'timestamp', 'content_type', 'content_encoding'])
+Header.__new__.__defaults__ = (None, None)
+
+
+class ModelMeta(type):
+    """Reads ``Meta.schema`` once, when the model class is created.
+
+    Field metadata is stored on the class and, unless the model sets
+    ``Meta.slots = False``, the fields are laid out in ``__slots__`` so
+    instances carry no per-instance ``__dict__``.
+    """
+    def __new__(mcs, name, bases, namespace):
+        meta = namespace.get('Meta') or mcs._find_inherited_meta(bases)
+        schema_class = getattr(meta, 'schema', None)
+        if isinstance(schema_class, type):
+            schema_fields = schemas.get_fields(schema_class)
+            namespace['_model_fields'] = schema_fields
+            if getattr(meta, 'slots', True) and '__slots__' not in namespace:
+                slots = mcs._get_slots(schema_fields, bases, namespace)
+                if slots is not None:
+                    namespace['__slots__'] = slots
+        return super().__new__(mcs, name, bases, namespace)
+
+    @staticmethod
+    def _find_inherited_meta(bases):
+        for base in bases:
+            meta = getattr(base, 'Meta', None)
+            if isinstance(meta, type):
+                return meta
+        return None
+
+    @staticmethod
+    def _get_slots(schema_fields, bases, namespace):
+        if any(field_name in namespace for field_name in schema_fields.fields):
+            return None
+        return tuple(
+            field_name for field_name in schema_fields.fields
+            if not any(hasattr(base, field_name) for base in bases)
+        )
+
+
+class Model(metaclass=ModelMeta):
+    __slots__ = ()
+    _model_fields = None
 
-class Model:
     @property
     def Meta(self):
         raise NotImplementedError
 
     def __init__(self, **kwargs):
-        self._validate_with_schema_fields(kwargs, self._schema_fields)
-        for field_name in self._schema_fields.keys():
+        schema_fields = self._get_schema_fields()
+        self._validate_with_schema_fields(kwargs, schema_fields)
+        for field_name in schema_fields.fields.keys():
             setattr(self, field_name, kwargs.get(field_name))
 
     def __repr__(self):
         return '<{0}({1})>'.format(
             self.__class__.__name__,
-            (', '.join(['='.join((key, repr(value))) for key, value in self.__dict__.items()])),
+            (', '.join([
+                '='.join((field_name, repr(getattr(self, field_name, None))))
+                for field_name in self._schema_fields.keys()
+            ])),
         )
 
     def __eq__(self, other):
+        if self.__class__ is other.__class__:
+            get_values = self._get_schema_fields().values
+            return get_values(self) == get_values(other)
         return all(
             getattr(self, field_name, None) == getattr(other, field_name, None)
             for field_name in self._schema_fields.keys()
@@ -28,26 +79,23 @@ class Model:
 
     @property
     def _schema_fields(self):
-        return self.Meta.schema().fields
+        return self._get_schema_fields().fields
+
+    def _get_schema_fields(self) -> schemas.SchemaFields:
+        return self._model_fields or schemas.get_fields(self.Meta.schema)
 
     @staticmethod
-    def _validate_with_schema_fields(model_fields, schema_fields):
-        model_fields_names = set(model_fields.keys())
-        schema_fields_names = set(schema_fields.keys())
-        schema_required_fields_names = {
-            field_name
-            for field_name, field in schema_fields.items()
-            if field.required
-        }
-        unexpected_fields = model_fields_names - schema_fields_names
-        if len(unexpected_fields) > 0:
+    def _validate_with_schema_fields(model_fields, schema_fields: schemas.SchemaFields):
+        model_fields_names = model_fields.keys()
+        if not model_fields_names <= schema_fields.names:
             raise TypeError("Got unexpected fields '{}'".format(
-                unexpected_fields))
-        missing_required_fields = schema_required_fields_names - model_fields_names
-        if len(missing_required_fields) > 0:
+                set(model_fields_names) - schema_fields.names))
+        if not schema_fields.required <= model_fields_names:
             raise TypeError("Missing required fields '{}'".format(
-                missing_required_fields))
+                set(schema_fields.required - model_fields_names)))
 
 
 PulledMessage = collections.namedtuple(
-    'PulledMessage', ['ack', 'data', 'message_id', 'attributes'])
+    'PulledMessage',
+    ['ack', 'data', 'message_id', 'attributes', 'nack', 'modify_ack_deadline', 'ack_id'])
+PulledMessage.__new__.__defaults__ = (None, None, None)
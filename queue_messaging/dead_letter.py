@@ -0,0 +1,75 @@
+import concurrent.futures
+import logging
+import threading
+
+from queue_messaging import exceptions
+from queue_messaging import retrying
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_IN_FLIGHT = 1000
+
+
+class DeadLetterQueue:
+    """Publishes messages to the dead letter topic without blocking on it.
+
+    Publishes go through the dead letter client's batching publisher and
+    the original message is acknowledged only after its dead letter
+    publish succeeded; when it fails the message is nacked for redelivery.
+    Failed publishes are retried according to `retry`. At most
+    `max_in_flight` publishes are outstanding, further calls wait for a
+    slot.
+    """
+    def __init__(self, client, max_in_flight=DEFAULT_MAX_IN_FLIGHT, retry=None):
+        self._client = client
+        self._retry = retry or retrying.Retrying()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+
+    def send(self, pulled_message):
+        message = pulled_message.data
+        attributes = pulled_message.attributes
+        self._slots.acquire()
+        try:
+            publish_future = self._retry.call(
+                lambda: self._client.send(message=message, **attributes))
+        except exceptions.QueueClientError as e:
+            self._slots.release()
+            raise exceptions.QueueMessagingError(
+                'Error while sending a message to the dead letter queue',
+                data=message,
+                attributes=attributes,
+                error=e,
+            )
+        except Exception:
+            self._slots.release()
+            raise
+        future = concurrent.futures.Future()
+        future.set_running_or_notify_cancel()
+        if publish_future is None:
+            self._on_published(pulled_message, future, None)
+        else:
+            publish_future.add_done_callback(
+                lambda _: self._on_published(pulled_message, future, publish_future))
+        return future
+
+    def _on_published(self, pulled_message, future, publish_future):
+        self._slots.release()
+        try:
+            message_id = publish_future.result() if publish_future is not None else None
+        except Exception as e:
+            logger.error(
+                'Error while sending a message to the dead letter queue',
+                exc_info=True, extra={'message_id': pulled_message.message_id})
+            if pulled_message.nack is not None:
+                logger.debug('Message NACK')
+                pulled_message.nack()
+            future.set_exception(exceptions.QueueMessagingError(
+                'Error while sending a message to the dead letter queue',
+                attributes=pulled_message.attributes,
+                error=e,
+            ))
+        else:
+            logger.debug('Message ACK')
+            pulled_message.ack()
+            future.set_result(message_id)
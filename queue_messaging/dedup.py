@@ -0,0 +1,124 @@
+import collections
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_SIZE = 100000
+DEFAULT_TTL = 600.0
+PURGE_EVERY = 1000
+
+
+class MemoryCache:
+    """Least recently used message ids, each forgotten after `ttl` seconds."""
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE, ttl=DEFAULT_TTL, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._expiry = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._expiry)
+
+    def __contains__(self, message_id):
+        with self._lock:
+            expires = self._expiry.get(message_id)
+            if expires is None:
+                return False
+            if expires <= self.clock():
+                del self._expiry[message_id]
+                return False
+            self._expiry.move_to_end(message_id)
+            return True
+
+    def add(self, message_id):
+        with self._lock:
+            self._expiry[message_id] = self.clock() + self.ttl
+            self._expiry.move_to_end(message_id)
+            while len(self._expiry) > self.max_size:
+                self._expiry.popitem(last=False)
+
+
+class SQLiteStore:
+    """Message ids kept in a SQLite file, shared by processes on one host."""
+    def __init__(self, path, ttl=DEFAULT_TTL, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._added = 0
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS processed_messages ('
+            'message_id TEXT PRIMARY KEY, '
+            'expires REAL NOT NULL)')
+
+    def __contains__(self, message_id):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT 1 FROM processed_messages WHERE message_id = ? AND expires > ?',
+                (message_id, self.clock())).fetchone()
+        return row is not None
+
+    def add(self, message_id):
+        now = self.clock()
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO processed_messages (message_id, expires) VALUES (?, ?)',
+                (message_id, now + self.ttl))
+            self._added += 1
+            if self._added % PURGE_EVERY == 0:
+                self._connection.execute(
+                    'DELETE FROM processed_messages WHERE expires <= ?', (now,))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class Deduplicator:
+    """Recognizes redelivered messages by their message id.
+
+    A message id is recorded when the message is acknowledged. Ids are
+    looked up in the in-memory `cache` first and then in the optional
+    shared `store`; `hits` and `misses` count the lookups.
+    """
+    def __init__(self, cache=None, store=None):
+        self.cache = cache if cache is not None else MemoryCache()
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def is_duplicate(self, message_id):
+        if message_id in self.cache:
+            duplicate = True
+        elif self.store is not None and message_id in self.store:
+            self.cache.add(message_id)
+            duplicate = True
+        else:
+            duplicate = False
+        with self._lock:
+            if duplicate:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return duplicate
+
+    def record(self, message_id):
+        self.cache.add(message_id)
+        if self.store is not None:
+            self.store.add(message_id)
+
+    def track(self, pulled_message):
+        """Return `pulled_message` recording its id when it is acknowledged."""
+        def ack():
+            pulled_message.ack()
+            self.record(pulled_message.message_id)
+        return pulled_message._replace(ack=ack)
+
+    @property
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
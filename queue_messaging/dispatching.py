@@ -0,0 +1,71 @@
+import logging
+
+from queue_messaging import exceptions
+from queue_messaging.data import schemas
+
+
+logger = logging.getLogger(__name__)
+
+ACKNOWLEDGE = 'acknowledge'
+DEAD_LETTER = 'dead_letter'
+UNHANDLED_MESSAGE_POLICIES = (ACKNOWLEDGE, DEAD_LETTER)
+
+
+class Dispatcher:
+    """Routes envelopes to handlers registered per model class.
+
+    Routing only looks at the message header, so messages without a
+    handler are never decoded; they are acknowledged or sent to the dead
+    letter queue depending on `unhandled_policy`. Messages whose header
+    cannot be decoded are always sent to the dead letter queue, or nacked
+    when there is no dead letter topic.
+    """
+    def __init__(self, type_to_model, unhandled_policy=ACKNOWLEDGE):
+        if unhandled_policy not in UNHANDLED_MESSAGE_POLICIES:
+            raise exceptions.ConfigurationError(
+                'Unknown unhandled message policy: {}'.format(unhandled_policy))
+        self._type_to_model = type_to_model
+        self._unhandled_policy = unhandled_policy
+        self._handlers = {}
+
+    def on(self, model_class):
+        type_name = self._register_model(model_class)
+
+        def decorator(handler):
+            self._handlers[type_name] = handler
+            return handler
+        return decorator
+
+    def __call__(self, envelope):
+        try:
+            type_name = envelope.header.type
+        except exceptions.DecodingError:
+            logger.warning('Dispatching message with invalid header', exc_info=True)
+            envelope.reject()
+            return
+        handler = self._handlers.get(type_name)
+        if handler is None:
+            self._handle_unhandled(envelope)
+        else:
+            handler(envelope)
+
+    def _register_model(self, model_class):
+        try:
+            type_name = model_class.Meta.type_name
+        except AttributeError:
+            raise exceptions.ConfigurationError(
+                'Expected class with Meta.type_name: {}'.format(model_class)
+            )
+        registered_class = self._type_to_model.setdefault(type_name, model_class)
+        if registered_class is not model_class:
+            raise exceptions.ConfigurationError(
+                'Multiple models defined for type: {}'.format(type_name)
+            )
+        schemas.registry.register(model_class)
+        return type_name
+
+    def _handle_unhandled(self, envelope):
+        if self._unhandled_policy == DEAD_LETTER:
+            envelope.mark_as_dead_letter()
+        else:
+            envelope.acknowledge()
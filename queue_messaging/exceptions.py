@@ -18,6 +18,10 @@ class QueueMessagingError(BaseExceptionWithPayload):
     default_message = 'Error in queue messaging.'
 
 
+class PublisherOverflowError(QueueMessagingError):
+    default_message = 'Too many outstanding publishes.'
+
+
 class EncodingError(BaseExceptionWithPayload):
     default_message = 'Error while encoding data.'
 
@@ -1,12 +1,25 @@
 import logging
+import time
 
 from cached_property import cached_property
 
+from queue_messaging import coalescing
 from queue_messaging import configuration
+from queue_messaging import consuming
+from queue_messaging import dead_letter
+from queue_messaging import dedup
+from queue_messaging import dispatching
 from queue_messaging import exceptions
+from queue_messaging import outbox
+from queue_messaging import publishing
+from queue_messaging import retrying
+from queue_messaging.data import codecs
+from queue_messaging.data import compression
 from queue_messaging.data import encoding
+from queue_messaging.data import json_engines
+from queue_messaging.data import schemas
 from queue_messaging.data import structures
-from queue_messaging.services import pubsub
+from queue_messaging import services
 
 
 logger = logging.getLogger(__name__)
@@ -14,16 +27,38 @@ logger = logging.getLogger(__name__)
 
 class Envelope:
     def __init__(self, pulled_message, client, dead_letter_client,
-                 type_to_model):
+                 type_to_model, payload_codecs=None, dead_letter_queue=None):
         self._pulled_message = pulled_message
         self._client = client
         self._dead_letter_client = dead_letter_client
         self._type_to_model = type_to_model
+        self._payload_codecs = payload_codecs
+        self._dead_letter_queue = (
+            dead_letter_queue or dead_letter.DeadLetterQueue(dead_letter_client))
 
     def acknowledge(self):
         logger.debug('Message ACK')
         self._pulled_message.ack()
 
+    @property
+    def ack_id(self):
+        return self._pulled_message.ack_id
+
+    def nack(self):
+        """Release the message for immediate redelivery."""
+        logger.debug('Message NACK')
+        self._pulled_message.nack()
+
+    def extend(self, seconds):
+        """Set the message ack deadline to `seconds` from now.
+
+        Leases of messages being handled are extended automatically up to
+        `CONSUMER_MAX_LEASE_DURATION`; this is for handlers that know up
+        front they need longer.
+        """
+        logger.debug('Message ack deadline extended', extra={'seconds': seconds})
+        self._pulled_message.modify_ack_deadline(seconds)
+
     @cached_property
     def model(self):
         if self._pulled_message is None:
@@ -31,43 +66,114 @@ class Envelope:
         return encoding.decode_payload(
             header=self.header,
             encoded_data=self._pulled_message.data,
-            message_config=self._type_to_model)
+            message_config=self._type_to_model,
+            payload_codecs=self._payload_codecs)
 
     @cached_property
     def header(self) -> structures.Header:
         return encoding.create_header(self._pulled_message.attributes)
 
+    @property
+    def has_dead_letter_topic(self):
+        return self._dead_letter_client.topic_name is not None
+
     def mark_as_dead_letter(self):
-        self._send_to_dead_letter_queue()
-        self.acknowledge()
+        """Send the message to the dead letter queue.
 
-    def _send_to_dead_letter_queue(self):
-        message = self._pulled_message.data
-        attributes = self._pulled_message.attributes
-        try:
-            self._dead_letter_client.send(message=message, **attributes)
-        except exceptions.QueueClientError as e:
-            raise exceptions.QueueMessagingError(
-                'Error while sending a message to the dead letter queue',
-                data=message,
-                attributes=attributes,
-                error=e,
-            )
+        The message is acknowledged once the dead letter publish succeeds.
+        Returns a future of the dead letter publish.
+        """
+        return self._dead_letter_queue.send(self._pulled_message)
+
+    def reject(self):
+        """Send the message to the dead letter queue, or nack it without one."""
+        if self.has_dead_letter_topic:
+            self.mark_as_dead_letter()
+        else:
+            self.nack()
 
 
 class Messaging:
-    def __init__(self, client, dead_letter_client, type_to_model):
+    def __init__(self, client, dead_letter_client, type_to_model, json_engine=None,
+                 content_type=None, compressor=None,
+                 compression_threshold=compression.DEFAULT_THRESHOLD,
+                 unhandled_message_policy=dispatching.ACKNOWLEDGE,
+                 consumer_processes=None,
+                 dead_letter_max_in_flight=dead_letter.DEFAULT_MAX_IN_FLIGHT,
+                 publish_retry=None, outbox=None, publish_flow_controller=None,
+                 deduplicator=None, coalesce_window=None):
         self._client = client
         self._dead_letter_client = dead_letter_client
         self._type_to_model = type_to_model
+        self._payload_codecs = codecs.Codecs(json_engine)
+        self._codec = self._payload_codecs.get_for_publishing(content_type)
+        self._compressor = compressor
+        self._compression_threshold = compression_threshold
+        publish_retry = publish_retry or retrying.Retrying()
+        self._publisher = publishing.Publisher(
+            client, publish_retry, outbox, publish_flow_controller)
+        self.dispatcher = dispatching.Dispatcher(type_to_model, unhandled_message_policy)
+        self._consumer_processes = consumer_processes
+        self._dead_letter_queue = dead_letter.DeadLetterQueue(
+            dead_letter_client, dead_letter_max_in_flight, publish_retry)
+        self.deduplicator = deduplicator
+        if coalesce_window is None:
+            self._coalescer = None
+        else:
+            self._coalescer = coalescing.Coalescer(coalesce_window, self._send_model)
 
     @classmethod
     def create_from_dict(cls, dict):
         config = configuration.Factory(dict).create()
-        client = pubsub.get_pubsub_client(config)
-        dead_letter_client = pubsub.get_fallback_pubsub_client(config)
+        client, dead_letter_client = services.get_clients(config)
         type_to_model = cls._create_type_mapping(config.MESSAGE_TYPES)
-        return cls(client, dead_letter_client, type_to_model)
+        json_engine = json_engines.get_engine(config.JSON_ENGINE)
+        return cls(client, dead_letter_client, type_to_model, json_engine=json_engine,
+                   content_type=config.CONTENT_TYPE,
+                   compressor=compression.get_compressor(config.COMPRESSION),
+                   compression_threshold=config.COMPRESSION_THRESHOLD,
+                   unhandled_message_policy=config.UNHANDLED_MESSAGE_POLICY,
+                   consumer_processes=config.CONSUMER_PROCESSES,
+                   dead_letter_max_in_flight=config.DEAD_LETTER_MAX_IN_FLIGHT,
+                   publish_retry=retrying.create_retrying(
+                       max_attempts=config.PUBLISH_RETRY_MAX_ATTEMPTS,
+                       initial_delay=config.PUBLISH_RETRY_INITIAL_DELAY,
+                       max_delay=config.PUBLISH_RETRY_MAX_DELAY,
+                       budget_ratio=config.PUBLISH_RETRY_BUDGET_RATIO),
+                   outbox=cls._create_outbox(config),
+                   publish_flow_controller=cls._create_publish_flow_controller(config),
+                   deduplicator=cls._create_deduplicator(config),
+                   coalesce_window=config.COALESCE_WINDOW)
+
+    @staticmethod
+    def _create_outbox(config):
+        if config.OUTBOX_PATH is None:
+            return None
+        return outbox.Outbox(
+            config.OUTBOX_PATH, batch_size=config.OUTBOX_BATCH_SIZE,
+            drain_interval=config.OUTBOX_DRAIN_INTERVAL)
+
+    @staticmethod
+    def _create_publish_flow_controller(config):
+        if (config.PUBLISH_MAX_OUTSTANDING_MESSAGES is None and
+                config.PUBLISH_MAX_OUTSTANDING_BYTES is None):
+            return None
+        return publishing.FlowController(
+            max_messages=config.PUBLISH_MAX_OUTSTANDING_MESSAGES,
+            max_bytes=config.PUBLISH_MAX_OUTSTANDING_BYTES,
+            overflow=config.PUBLISH_OVERFLOW)
+
+    @staticmethod
+    def _create_deduplicator(config):
+        if config.DEDUP_CACHE_SIZE is None and config.DEDUP_PATH is None:
+            return None
+        cache = dedup.MemoryCache(
+            max_size=config.DEDUP_CACHE_SIZE or dedup.DEFAULT_CACHE_SIZE, ttl=config.DEDUP_TTL)
+        if config.DEDUP_PATH is None:
+            store = None
+        else:
+            store = dedup.SQLiteStore(config.DEDUP_PATH, ttl=config.DEDUP_TTL)
+        return dedup.Deduplicator(cache, store)
 
     @staticmethod
     def _create_type_mapping(types):
@@ -83,41 +189,196 @@ class Messaging:
                 raise exceptions.ConfigurationError(
                     'Multiple models defined for type: {}'.format(type_name)
                 )
+            schemas.registry.register(model_class)
             type_to_model[type_name] = model_class
         return type_to_model
 
     def send(self, model: structures.Model):
-        attributes = self._get_attributes(model)
-        message = self._get_message(model)
-        self._send_message(message, attributes)
+        """Publish `model` without waiting for the result.
+
+        Returns a future resolving to the message id. Transient failures are
+        retried in the background; the future fails once retries run out,
+        unless an outbox is configured (`OUTBOX_PATH`), in which case the
+        message is stored for later delivery and the future resolves to None.
+
+        With `COALESCE_WINDOW` set, models declaring ``Meta.coalesce_key``
+        are held back for that many seconds and only the latest one per key
+        is published.
+        """
+        if self._coalescer is not None:
+            key = coalescing.get_key(model)
+            if key is not None:
+                return self._coalescer.add(key, model)
+        return self._send_model(model)
+
+    def _send_model(self, model):
+        message, attributes = self._prepare_message(model)
+        return self._send_message(message, attributes)
+
+    def send_many(self, models):
+        """Send all models through the batching publisher.
+
+        Every model is encoded before anything is published, so an invalid
+        model does not leave the batch half sent. Returns a future resolving
+        to the list of published message ids.
+        """
+        messages = [self._prepare_message(model) for model in models]
+        return self._publisher.publish_many(messages)
+
+    def flush(self, timeout=None):
+        if self._coalescer is not None:
+            self._coalescer.flush()
+        self._publisher.flush(timeout)
+
+    def close(self, timeout=None):
+        """Flush pending publishes and release the outbox and dedup store.
+
+        Stops the outbox drainer; the instance should not be used afterwards.
+        """
+        try:
+            self.flush(timeout)
+        finally:
+            self._publisher.close()
+            if self.deduplicator is not None and self.deduplicator.store is not None:
+                self.deduplicator.store.close()
 
     def receive(self, callback):
-        self._pull_message(lambda message: callback(self._wrap_in_envelope(message)))
+        self._pull_message(lambda message: self._handle_received(message, callback))
+
+    def subscribe(self, callback):
+        """Like `receive`, but returns the streaming future instead of blocking."""
+        try:
+            return self._client.subscribe(
+                lambda message: self._handle_received(message, callback))
+        except exceptions.QueueClientError as e:
+            raise exceptions.QueueMessagingError(
+                'Error while receiving a message',
+                error=e,
+            )
+
+    def pull(self, max_messages, timeout=None):
+        """Synchronously pull up to `max_messages` envelopes."""
+        try:
+            pulled_messages = self._client.pull(max_messages, timeout=timeout)
+        except exceptions.QueueClientError as e:
+            raise exceptions.QueueMessagingError(
+                'Error while receiving a message',
+                error=e,
+            )
+        return [self._wrap_in_envelope(pulled_message) for pulled_message in pulled_messages]
+
+    def receive_batches(self, handler, batch_size=100, max_wait=1.0):
+        """Call `handler` with lists of decoded models, forever.
+
+        A batch is handed over once `batch_size` messages were pulled or
+        `max_wait` seconds passed. All messages of a batch are acknowledged
+        together after the handler returns; when it raises, none are and
+        the exception is propagated. Messages which cannot be decoded are
+        sent to the dead letter queue, or nacked without a dead letter topic.
+        """
+        while True:
+            envelopes = self._pull_batch(batch_size, max_wait)
+            if envelopes:
+                self._handle_batch(handler, envelopes)
+
+    def _pull_batch(self, batch_size, max_wait):
+        deadline = time.monotonic() + max_wait
+        envelopes = []
+        while len(envelopes) < batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            envelopes.extend(self.pull(batch_size - len(envelopes), timeout=remaining))
+        return envelopes
+
+    def _handle_batch(self, handler, envelopes):
+        decoded_envelopes = []
+        for envelope in envelopes:
+            try:
+                envelope.model
+            except exceptions.DecodingError:
+                logger.warning('Error while decoding a message in batch', exc_info=True)
+                envelope.reject()
+            else:
+                decoded_envelopes.append(envelope)
+        if decoded_envelopes:
+            handler([envelope.model for envelope in decoded_envelopes])
+            self._acknowledge_all(decoded_envelopes)
+
+    def _acknowledge_all(self, envelopes):
+        try:
+            self._client.acknowledge([envelope.ack_id for envelope in envelopes])
+        except exceptions.QueueClientError as e:
+            raise exceptions.QueueMessagingError(
+                'Error while acknowledging messages',
+                error=e,
+            )
+
+    def receive_in_processes(self, handler):
+        """Receive messages and run `handler(model)` in a process pool.
+
+        `handler` has to be picklable, e.g. a module level function. Messages
+        are acknowledged after the handler returns and dead-lettered when it
+        raises. When a worker process dies the message is nacked and the pool
+        is replaced.
+        """
+        process_pool_handler = consuming.ProcessPoolHandler(handler, self._consumer_processes)
+        try:
+            self.receive(process_pool_handler)
+        finally:
+            process_pool_handler.shutdown()
+
+    def on(self, model_class):
+        """Register a handler for messages of `model_class`, used by `dispatch`.
+
+            @messaging.on(FancyEvent)
+            def handle_fancy_event(envelope):
+                ...
+        """
+        return self.dispatcher.on(model_class)
+
+    def dispatch(self):
+        self.receive(self.dispatcher)
+
+    def _handle_received(self, pulled_message, callback):
+        """Pass the message to `callback`, unless it was already processed.
+
+        With a deduplicator, redelivered messages whose id was acknowledged
+        before are acknowledged again without being decoded.
+        """
+        if self.deduplicator is not None:
+            if self.deduplicator.is_duplicate(pulled_message.message_id):
+                logger.debug('Duplicate message ACK', extra={
+                    'message_id': pulled_message.message_id})
+                pulled_message.ack()
+                return
+            pulled_message = self.deduplicator.track(pulled_message)
+        callback(self._wrap_in_envelope(pulled_message))
 
     def _wrap_in_envelope(self, pulled_message):
         return Envelope(
             pulled_message=pulled_message,
             client=self._client,
             dead_letter_client=self._dead_letter_client,
-            type_to_model=self._type_to_model
+            type_to_model=self._type_to_model,
+            payload_codecs=self._payload_codecs,
+            dead_letter_queue=self._dead_letter_queue,
         )
 
+    def _prepare_message(self, model: structures.Model):
+        attributes = self._get_attributes(model)
+        message = self._get_message(model)
+        return compression.compress(
+            message, attributes, self._compressor, self._compression_threshold)
+
     def _get_attributes(self, model: structures.Model):
-        return encoding.create_attributes(model)
+        return encoding.create_attributes(model, content_type=self._codec.content_type)
 
     def _get_message(self, model):
-        return encoding.encode(model)
+        return encoding.encode(model, codec=self._codec)
 
     def _send_message(self, message, attributes):
-        try:
-            self._client.send(message=message, **attributes)
-        except exceptions.QueueClientError as e:
-            raise exceptions.QueueMessagingError(
-                'Error while sending a message',
-                attributes=attributes,
-                model=message,
-                error=e,
-            )
+        return self._publisher.publish(message, attributes)
 
     def _pull_message(self, callback):
         try:
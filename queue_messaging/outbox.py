@@ -0,0 +1,210 @@
+import concurrent.futures
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_DRAIN_INTERVAL = 5.0
+DEFAULT_PUBLISH_TIMEOUT = 60.0
+
+
+class Outbox:
+    """Messages waiting to be published, kept in a SQLite file.
+
+    Messages which could not be published are stored here and replayed in
+    the order they were stored by a background drainer started with
+    `start_draining`. A drained batch is published at once; messages are
+    removed only after their publish and the publishes of all messages
+    stored before them succeeded, so a message may be published again.
+
+    Several outboxes, also in other processes, may share one file. A
+    drainer claims its batch for `claim_timeout` seconds and no other
+    drainer claims messages while the claim holds.
+    """
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE,
+                 drain_interval=DEFAULT_DRAIN_INTERVAL,
+                 publish_timeout=DEFAULT_PUBLISH_TIMEOUT,
+                 claim_timeout=None, clock=time.time):
+        self.path = path
+        self.batch_size = batch_size
+        self.drain_interval = drain_interval
+        self.publish_timeout = publish_timeout
+        self.claim_timeout = claim_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._connection = self._connect(path)
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _connect(path):
+        connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS outbox ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+            'message BLOB NOT NULL, '
+            'attributes TEXT NOT NULL, '
+            'claimed_until REAL)')
+        columns = [row[1] for row in connection.execute('PRAGMA table_info(outbox)')]
+        if 'claimed_until' not in columns:
+            connection.execute('ALTER TABLE outbox ADD COLUMN claimed_until REAL')
+        return connection
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+
+    def put(self, message, attributes):
+        if isinstance(message, str):
+            message = message.encode('utf-8')
+        with self._lock:
+            self._connection.execute(
+                'INSERT INTO outbox (message, attributes) VALUES (?, ?)',
+                (message, json.dumps(attributes)))
+        logger.info('Message stored in outbox', extra={'outbox_size': len(self)})
+
+    def peek(self, limit):
+        """Return up to `limit` oldest `(id, message, attributes)` entries."""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT id, message, attributes FROM outbox ORDER BY id LIMIT ?',
+                (limit,)).fetchall()
+        return self._to_entries(rows)
+
+    def claim(self, limit):
+        """Claim up to `limit` oldest entries, like `peek`.
+
+        Returns no entries while messages are claimed by another drainer.
+        Claimed entries have to be given back with `release` or `remove`.
+        """
+        now = self.clock()
+        claim_timeout = self.claim_timeout
+        if claim_timeout is None:
+            claim_timeout = 2 * self.publish_timeout
+        with self._lock:
+            self._connection.execute('BEGIN IMMEDIATE')
+            try:
+                claimed = self._connection.execute(
+                    'SELECT 1 FROM outbox WHERE claimed_until > ? LIMIT 1',
+                    (now,)).fetchone()
+                if claimed is None:
+                    rows = self._connection.execute(
+                        'SELECT id, message, attributes FROM outbox ORDER BY id LIMIT ?',
+                        (limit,)).fetchall()
+                    self._connection.executemany(
+                        'UPDATE outbox SET claimed_until = ? WHERE id = ?',
+                        [(now + claim_timeout, row[0]) for row in rows])
+                else:
+                    rows = []
+            except Exception:
+                self._connection.execute('ROLLBACK')
+                raise
+            self._connection.execute('COMMIT')
+        return self._to_entries(rows)
+
+    @staticmethod
+    def _to_entries(rows):
+        return [(row_id, bytes(message), json.loads(attributes))
+                for row_id, message, attributes in rows]
+
+    def release(self, ids):
+        if not ids:
+            return
+        with self._lock:
+            self._connection.executemany(
+                'UPDATE outbox SET claimed_until = NULL WHERE id = ?',
+                [(row_id,) for row_id in ids])
+
+    def remove(self, ids):
+        if not ids:
+            return
+        with self._lock:
+            self._connection.executemany(
+                'DELETE FROM outbox WHERE id = ?', [(row_id,) for row_id in ids])
+
+    def drain(self, send, is_retryable=None):
+        """Publish the oldest batch with `send(message, **attributes)`.
+
+        Messages failing with an error `is_retryable(error)` rejects are
+        dropped, as publishing them again would fail the same way. The first
+        retryable failure or publish timeout keeps that message and all later
+        ones. Returns whether the whole batch was done with, False also when
+        nothing could be claimed.
+        """
+        entries = self.claim(self.batch_size)
+        if not entries:
+            return False
+        removed = []
+        try:
+            retry_left = self._publish(entries, send, is_retryable, removed)
+        finally:
+            self.remove(removed)
+            self.release([row_id for row_id, _, _ in entries if row_id not in removed])
+        return not retry_left
+
+    def _publish(self, entries, send, is_retryable, removed):
+        futures = []
+        for row_id, message, attributes in entries:
+            try:
+                futures.append((row_id, attributes, send(message, **attributes)))
+            except Exception as e:
+                if self._is_retryable(e, is_retryable):
+                    logger.warning('Error while draining outbox', exc_info=True)
+                    break
+                future = concurrent.futures.Future()
+                future.set_exception(e)
+                futures.append((row_id, attributes, future))
+        deadline = time.monotonic() + self.publish_timeout
+        for row_id, attributes, future in futures:
+            try:
+                if future is not None:
+                    future.result(timeout=max(deadline - time.monotonic(), 0))
+            except concurrent.futures.TimeoutError:
+                logger.warning('Timeout while draining outbox')
+                return True
+            except Exception as e:
+                if self._is_retryable(e, is_retryable):
+                    logger.warning('Error while draining outbox', exc_info=True)
+                    return True
+                self._log_dropped(attributes)
+            removed.append(row_id)
+        return len(futures) < len(entries)
+
+    @staticmethod
+    def _is_retryable(error, is_retryable):
+        return is_retryable is None or is_retryable(error)
+
+    @staticmethod
+    def _log_dropped(attributes):
+        logger.error(
+            'Dropping message from outbox after a non retryable error',
+            exc_info=True, extra={'attributes': attributes})
+
+    def start_draining(self, send, is_retryable=None):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._drain_forever, args=(send, is_retryable),
+                name='queue-messaging-outbox', daemon=True)
+            self._thread.start()
+
+    def _drain_forever(self, send, is_retryable):
+        while not self._stopped.is_set():
+            if len(self) and self.drain(send, is_retryable):
+                continue
+            self._stopped.wait(self.drain_interval)
+
+    def close(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            self._connection.close()
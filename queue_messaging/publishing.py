@@ -0,0 +1,192 @@
+import concurrent.futures
+import logging
+import threading
+import time
+
+from queue_messaging import exceptions
+from queue_messaging import retrying
+from queue_messaging import utils
+
+
+logger = logging.getLogger(__name__)
+
+BLOCK = 'block'
+RAISE = 'raise'
+OUTBOX = 'outbox'
+OVERFLOW_MODES = (BLOCK, RAISE, OUTBOX)
+
+
+class FlowController:
+    """Bounds the number and total size of outstanding publishes.
+
+    When a publish does not fit, `overflow` decides what happens: `block`
+    waits until earlier publishes finish, `raise` raises
+    `PublisherOverflowError` and `outbox` stores the message in the outbox.
+    A single message larger than `max_bytes` is let through once nothing
+    else is outstanding.
+    """
+    def __init__(self, max_messages=None, max_bytes=None, overflow=BLOCK):
+        if overflow not in OVERFLOW_MODES:
+            raise exceptions.ConfigurationError(
+                'Unknown publisher overflow mode: {}'.format(overflow))
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.overflow = overflow
+        self._messages = 0
+        self._bytes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, size):
+        """Reserve room for a message, returns False when it does not fit."""
+        with self._condition:
+            if self.overflow == BLOCK:
+                while not self._fits(size):
+                    self._condition.wait()
+            elif not self._fits(size):
+                return False
+            self._messages += 1
+            self._bytes += size
+            return True
+
+    def release(self, size):
+        with self._condition:
+            self._messages -= 1
+            self._bytes -= size
+            self._condition.notify_all()
+
+    def _fits(self, size):
+        if self._messages == 0:
+            return True
+        if self.max_messages is not None and self._messages + 1 > self.max_messages:
+            return False
+        if self.max_bytes is not None and self._bytes + size > self.max_bytes:
+            return False
+        return True
+
+
+class Publisher:
+    def __init__(self, client, retry=None, outbox=None, flow_controller=None):
+        if (flow_controller is not None and flow_controller.overflow == OUTBOX and
+                outbox is None):
+            raise exceptions.ConfigurationError(
+                'Publisher overflow to outbox requires an outbox.')
+        self._client = client
+        self._retry = retry or retrying.Retrying()
+        self._outbox = outbox
+        self._flow_controller = flow_controller
+        self._pending = set()
+        self._lock = threading.Lock()
+        if outbox is not None:
+            outbox.start_draining(client.send, self._retry.is_retryable)
+
+    def publish(self, message, attributes):
+        """Publish a message, retrying transient failures in the background.
+
+        Returns a future resolving to the message id once a publish attempt
+        succeeded, or to the last error when retries were exhausted. With an
+        outbox, messages which failed with a retryable error are stored in it
+        instead and the future resolves to None; while the outbox is not empty
+        new messages are queued behind the stored ones.
+        """
+        if self._outbox is not None and len(self._outbox):
+            return self._spool(message, attributes)
+        if self._flow_controller is None:
+            return self._publish(message, attributes)
+        size = len(message)
+        if not self._flow_controller.acquire(size):
+            return self._overflow(message, attributes)
+        try:
+            future = self._publish(message, attributes)
+        except Exception:
+            self._flow_controller.release(size)
+            raise
+        future.add_done_callback(lambda _: self._flow_controller.release(size))
+        return future
+
+    def _publish(self, message, attributes):
+        try:
+            future = self._retry.call(
+                lambda: self._client.send(message=message, **attributes))
+        except exceptions.QueueClientError as e:
+            raise exceptions.QueueMessagingError(
+                'Error while sending a message',
+                attributes=attributes,
+                model=message,
+                error=e,
+            )
+        if self._outbox is not None:
+            future = self._spool_on_failure(future, message, attributes)
+        self._track(future)
+        return future
+
+    def publish_many(self, messages):
+        return utils.aggregate(
+            self.publish(message, attributes) for message, attributes in messages)
+
+    def flush(self, timeout=None):
+        logger.debug('Flushing publisher')
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for future in self._pending_futures():
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                future.result(timeout=remaining)
+            except concurrent.futures.TimeoutError:
+                raise
+            except Exception:
+                logger.debug('Pending message failed while flushing', exc_info=True)
+
+    def close(self):
+        if self._outbox is not None:
+            self._outbox.close()
+
+    def _overflow(self, message, attributes):
+        if self._flow_controller.overflow == OUTBOX:
+            logger.warning('Publisher flow control limit exceeded, storing in outbox')
+            return self._spool(message, attributes)
+        raise exceptions.PublisherOverflowError(
+            max_messages=self._flow_controller.max_messages,
+            max_bytes=self._flow_controller.max_bytes,
+        )
+
+    def _spool(self, message, attributes):
+        self._outbox.put(message, attributes)
+        future = concurrent.futures.Future()
+        future.set_result(None)
+        return future
+
+    def _spool_on_failure(self, publish_future, message, attributes):
+        future = concurrent.futures.Future()
+        future.set_running_or_notify_cancel()
+
+        def on_published(_):
+            try:
+                future.set_result(publish_future.result())
+            except Exception as e:
+                if not self._retry.is_retryable(e):
+                    future.set_exception(e)
+                    return
+                logger.warning('Error while sending a message, storing in outbox', exc_info=True)
+                try:
+                    self._outbox.put(message, attributes)
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(None)
+
+        publish_future.add_done_callback(on_published)
+        return future
+
+    def _track(self, future):
+        if future is None:
+            return
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._untrack)
+
+    def _untrack(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def _pending_futures(self):
+        with self._lock:
+            return list(self._pending)
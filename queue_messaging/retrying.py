@@ -0,0 +1,156 @@
+import collections
+import concurrent.futures
+import logging
+import random
+import threading
+
+from google.api_core import exceptions as google_api_exceptions
+
+from queue_messaging.utils import scheduling
+
+
+logger = logging.getLogger(__name__)
+
+
+Backoff = collections.namedtuple(
+    'Backoff', ['max_attempts', 'initial_delay', 'max_delay', 'multiplier', 'jitter'])
+Backoff.__new__.__defaults__ = (5, 0.1, 10.0, 2.0, 0.5)
+
+DEFAULT_BACKOFF = Backoff()
+THROTTLED_BACKOFF = Backoff(initial_delay=1.0, max_delay=60.0)
+
+DEFAULT_POLICIES = (
+    (google_api_exceptions.TooManyRequests, THROTTLED_BACKOFF),
+    (google_api_exceptions.ServiceUnavailable, DEFAULT_BACKOFF),
+    (google_api_exceptions.DeadlineExceeded, DEFAULT_BACKOFF),
+    (google_api_exceptions.InternalServerError, DEFAULT_BACKOFF),
+    (google_api_exceptions.Aborted, DEFAULT_BACKOFF),
+    (google_api_exceptions.Unknown, DEFAULT_BACKOFF),
+    (ConnectionError, DEFAULT_BACKOFF),
+)
+
+DEFAULT_BUDGET_RATIO = 0.1
+DEFAULT_BUDGET_MIN_RETRIES = 10
+
+
+class RetryBudget:
+    """Token bucket limiting retries to a fraction of the calls made.
+
+    Each call deposits `ratio` tokens and each retry withdraws one, so
+    during an outage at most `min_retries` plus `ratio` retries per call
+    are attempted instead of every call retrying `max_attempts` times.
+    """
+    def __init__(self, ratio=DEFAULT_BUDGET_RATIO, min_retries=DEFAULT_BUDGET_MIN_RETRIES):
+        self._ratio = ratio
+        self._max_tokens = min_retries
+        self._tokens = float(min_retries)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self._tokens + self._ratio, self._max_tokens)
+
+    def withdraw(self):
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class Retrying:
+    """Retries calls returning futures, with exponential backoff and jitter.
+
+    `policies` is a sequence of `(exception class, Backoff)` pairs; the
+    first one matching a failure decides whether and how it is retried.
+    Retries are scheduled on a background thread, never blocking the
+    caller.
+    """
+    def __init__(self, policies=DEFAULT_POLICIES, budget=None, scheduler=None,
+                 random=random.random):
+        self._policies = tuple(policies)
+        self._budget = budget or RetryBudget()
+        self._scheduler = scheduler or scheduling.default_scheduler
+        self._random = random
+
+    def call(self, function):
+        """Call `function` and return a future of its future's result.
+
+        Non retryable errors raised by the first call are raised directly.
+        """
+        future = concurrent.futures.Future()
+        future.set_running_or_notify_cancel()
+        self._budget.deposit()
+        try:
+            attempt_future = function()
+        except Exception as e:
+            if self.get_backoff(e) is None:
+                raise
+            self._on_failure(function, future, 1, e)
+        else:
+            self._chain(function, future, 1, attempt_future)
+        return future
+
+    def get_backoff(self, error):
+        for exception_class, backoff in self._policies:
+            if isinstance(error, exception_class):
+                return backoff
+        return None
+
+    def is_retryable(self, error):
+        return self.get_backoff(error) is not None
+
+    def get_delay(self, backoff, attempt):
+        delay = min(backoff.initial_delay * backoff.multiplier ** (attempt - 1), backoff.max_delay)
+        return delay * (1 - backoff.jitter * self._random())
+
+    def _attempt(self, function, future, attempt):
+        try:
+            attempt_future = function()
+        except Exception as e:
+            self._on_failure(function, future, attempt, e)
+        else:
+            self._chain(function, future, attempt, attempt_future)
+
+    def _chain(self, function, future, attempt, attempt_future):
+        if attempt_future is None:
+            future.set_result(None)
+        else:
+            attempt_future.add_done_callback(
+                lambda done: self._on_done(function, future, attempt, done))
+
+    def _on_done(self, function, future, attempt, attempt_future):
+        try:
+            result = attempt_future.result()
+        except Exception as e:
+            self._on_failure(function, future, attempt, e)
+        else:
+            future.set_result(result)
+
+    def _on_failure(self, function, future, attempt, error):
+        backoff = self.get_backoff(error)
+        if backoff is None or attempt >= backoff.max_attempts or not self._budget.withdraw():
+            future.set_exception(error)
+            return
+        delay = self.get_delay(backoff, attempt)
+        logger.info('Retrying failed call', extra={
+            'attempt': attempt, 'delay': delay, 'error': repr(error)})
+        self._scheduler.schedule(delay, lambda: self._attempt(function, future, attempt + 1))
+
+
+def create_retrying(max_attempts=None, initial_delay=None, max_delay=None, budget_ratio=None):
+    """Build `Retrying` with the default policies adjusted by settings."""
+    changes = {
+        'max_attempts': max_attempts,
+        'initial_delay': initial_delay,
+        'max_delay': max_delay,
+    }
+    changes = {key: value for key, value in changes.items() if value is not None}
+    policies = [
+        (exception_class, backoff._replace(**changes))
+        for exception_class, backoff in DEFAULT_POLICIES
+    ]
+    if budget_ratio is None:
+        budget_ratio = DEFAULT_BUDGET_RATIO
+    return Retrying(policies, budget=RetryBudget(ratio=budget_ratio))
+
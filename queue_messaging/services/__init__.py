@@ -0,0 +1,22 @@
+from queue_messaging import exceptions
+from queue_messaging.services import memory
+from queue_messaging.services import pubsub
+
+
+PUBSUB = 'pubsub'
+MEMORY = 'memory'
+
+BACKENDS = {
+    PUBSUB: (pubsub.get_pubsub_client, pubsub.get_fallback_pubsub_client),
+    MEMORY: (memory.get_memory_client, memory.get_fallback_memory_client),
+}
+
+
+def get_clients(queue_config):
+    """Create the client and dead letter client of the configured `BACKEND`."""
+    try:
+        get_client, get_fallback_client = BACKENDS[queue_config.BACKEND]
+    except KeyError:
+        raise exceptions.ConfigurationError(
+            'Unknown backend: {}'.format(queue_config.BACKEND))
+    return get_client(queue_config), get_fallback_client(queue_config)
@@ -0,0 +1,237 @@
+import collections
+import concurrent.futures
+import itertools
+import logging
+import threading
+import time
+
+from queue_messaging import exceptions
+from queue_messaging.data import structures
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ACK_DEADLINE = 10.0
+DEFAULT_MAX_DELIVERY_ATTEMPTS = 5
+POLL_INTERVAL = 0.1
+
+
+def get_memory_client(queue_config, broker=None):
+    broker = broker or default_broker
+    if queue_config.SUBSCRIPTION is not None:
+        broker.create_subscription(
+            queue_config.SUBSCRIPTION, queue_config.TOPIC,
+            dead_letter_topic=queue_config.DEAD_LETTER_TOPIC)
+    return Memory(
+        topic_name=queue_config.TOPIC,
+        subscription_name=queue_config.SUBSCRIPTION,
+        broker=broker,
+    )
+
+
+def get_fallback_memory_client(queue_config, broker=None):
+    return Memory(topic_name=queue_config.DEAD_LETTER_TOPIC, broker=broker)
+
+
+Message = collections.namedtuple(
+    'Message', ['message_id', 'data', 'attributes', 'delivery_attempt'])
+
+Lease = collections.namedtuple('Lease', ['message', 'deadline'])
+
+
+class Subscription:
+    def __init__(self, topic_name, ack_deadline, dead_letter_topic, max_delivery_attempts):
+        self.topic_name = topic_name
+        self.ack_deadline = ack_deadline
+        self.dead_letter_topic = dead_letter_topic
+        self.max_delivery_attempts = max_delivery_attempts
+        self.ready = collections.deque()
+        self.leases = {}
+
+
+class Broker:
+    """In-process broker with Pub/Sub delivery semantics.
+
+    Every subscription of a topic receives each message published to it.
+    Pulled messages are leased until acknowledged; once the ack deadline
+    passes they are redelivered, and subscriptions with a dead letter
+    topic move messages there after `max_delivery_attempts` deliveries.
+    `clock` can be replaced to control time in tests.
+    """
+    def __init__(self, ack_deadline=DEFAULT_ACK_DEADLINE, clock=time.monotonic):
+        self.ack_deadline = ack_deadline
+        self.clock = clock
+        self._topics = collections.defaultdict(set)
+        self._subscriptions = {}
+        self._message_ids = itertools.count(1)
+        self._ack_ids = itertools.count(1)
+        self._condition = threading.Condition()
+
+    def create_subscription(self, subscription_name, topic_name, ack_deadline=None,
+                            dead_letter_topic=None,
+                            max_delivery_attempts=DEFAULT_MAX_DELIVERY_ATTEMPTS):
+        with self._condition:
+            if subscription_name not in self._subscriptions:
+                self._subscriptions[subscription_name] = Subscription(
+                    topic_name, ack_deadline or self.ack_deadline,
+                    dead_letter_topic, max_delivery_attempts)
+                self._topics[topic_name].add(subscription_name)
+            return self._subscriptions[subscription_name]
+
+    def delete_subscription(self, subscription_name):
+        with self._condition:
+            subscription = self._subscriptions.pop(subscription_name)
+            self._topics[subscription.topic_name].discard(subscription_name)
+
+    def publish(self, topic_name, data, attributes):
+        with self._condition:
+            message_id = str(next(self._message_ids))
+            self._publish(topic_name, message_id, data, attributes)
+            return message_id
+
+    def _publish(self, topic_name, message_id, data, attributes):
+        for subscription_name in self._topics[topic_name]:
+            self._subscriptions[subscription_name].ready.append(
+                Message(message_id, data, dict(attributes), 0))
+        self._condition.notify_all()
+
+    def pull(self, subscription_name, max_messages, timeout=None):
+        """Lease up to `max_messages`, returns a list of `(ack_id, Message)`.
+
+        Waits up to `timeout` seconds (forever when None) for a message.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            subscription = self.get_subscription(subscription_name)
+            while True:
+                self._expire_leases(subscription)
+                if subscription.ready:
+                    return self._lease(subscription, max_messages)
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return []
+                self._condition.wait(
+                    POLL_INTERVAL if remaining is None else min(remaining, POLL_INTERVAL))
+
+    def acknowledge(self, subscription_name, ack_ids):
+        with self._condition:
+            subscription = self.get_subscription(subscription_name)
+            for ack_id in ack_ids:
+                subscription.leases.pop(ack_id, None)
+
+    def modify_ack_deadline(self, subscription_name, ack_ids, seconds):
+        with self._condition:
+            subscription = self.get_subscription(subscription_name)
+            deadline = self.clock() + seconds
+            for ack_id in ack_ids:
+                lease = subscription.leases.get(ack_id)
+                if lease is not None:
+                    subscription.leases[ack_id] = lease._replace(deadline=deadline)
+            if seconds <= 0:
+                self._expire_leases(subscription)
+                self._condition.notify_all()
+
+    def get_subscription(self, subscription_name):
+        try:
+            return self._subscriptions[subscription_name]
+        except KeyError:
+            raise exceptions.QueueClientError(
+                'Subscription does not exist.', subscription=subscription_name)
+
+    def _lease(self, subscription, max_messages):
+        deadline = self.clock() + subscription.ack_deadline
+        leased = []
+        while subscription.ready and len(leased) < max_messages:
+            message = subscription.ready.popleft()
+            message = message._replace(delivery_attempt=message.delivery_attempt + 1)
+            ack_id = str(next(self._ack_ids))
+            subscription.leases[ack_id] = Lease(message, deadline)
+            leased.append((ack_id, message))
+        return leased
+
+    def _expire_leases(self, subscription):
+        now = self.clock()
+        expired = [
+            (ack_id, lease.message) for ack_id, lease in subscription.leases.items()
+            if lease.deadline <= now
+        ]
+        for ack_id, message in sorted(expired, key=lambda item: int(item[0])):
+            del subscription.leases[ack_id]
+            if (subscription.dead_letter_topic is not None and
+                    message.delivery_attempt >= subscription.max_delivery_attempts):
+                logger.debug('Moving message to dead letter topic', extra={
+                    'message_id': message.message_id})
+                self._publish(
+                    subscription.dead_letter_topic, message.message_id,
+                    message.data, message.attributes)
+            else:
+                subscription.ready.append(message)
+
+
+default_broker = Broker()
+
+
+class Memory:
+    """Queue client backed by a `Broker`, interchangeable with `PubSub`."""
+    def __init__(self, topic_name, subscription_name=None, broker=None):
+        self.topic_name = topic_name
+        self.subscription_name = subscription_name
+        self.broker = broker or default_broker
+
+    def send(self, message, **attributes):
+        if self.topic_name is None:
+            raise exceptions.QueueClientError('Topic is not configured.')
+        if not isinstance(message, bytes):
+            message = message.encode('utf-8')
+        future = concurrent.futures.Future()
+        future.set_result(self.broker.publish(self.topic_name, message, attributes))
+        return future
+
+    def receive(self, callback):
+        self.subscribe(callback).result()
+
+    def subscribe(self, callback):
+        """Deliver messages to `callback` on a background thread.
+
+        Returns a future which stops delivery when cancelled. Messages are
+        nacked when the callback raises.
+        """
+        self.broker.get_subscription(self.subscription_name)
+        future = concurrent.futures.Future()
+        thread = threading.Thread(
+            target=self._deliver, args=(callback, future),
+            name='queue-messaging-memory-subscriber', daemon=True)
+        thread.start()
+        return future
+
+    def _deliver(self, callback, future):
+        while not future.cancelled():
+            for pulled_message in self.pull(1, timeout=POLL_INTERVAL):
+                try:
+                    callback(pulled_message)
+                except Exception:
+                    logger.exception('Error in message callback')
+                    pulled_message.nack()
+
+    def pull(self, max_messages, timeout=None):
+        return [
+            self._create_pulled_message(ack_id, message)
+            for ack_id, message in self.broker.pull(
+                self.subscription_name, max_messages, timeout)
+        ]
+
+    def _create_pulled_message(self, ack_id, message):
+        return structures.PulledMessage(
+            ack=lambda: self.acknowledge([ack_id]),
+            data=message.data,
+            message_id=message.message_id,
+            attributes=message.attributes,
+            nack=lambda: self.modify_ack_deadline([ack_id], 0),
+            modify_ack_deadline=lambda seconds: self.modify_ack_deadline([ack_id], seconds),
+            ack_id=ack_id,
+        )
+
+    def acknowledge(self, ack_ids):
+        self.broker.acknowledge(self.subscription_name, ack_ids)
+
+    def modify_ack_deadline(self, ack_ids, seconds):
+        self.broker.modify_ack_deadline(self.subscription_name, ack_ids, seconds)
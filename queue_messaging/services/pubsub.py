@@ -1,12 +1,17 @@
+import concurrent.futures
 import logging
+import threading
 
+import grpc
 import tenacity
-from cached_property import cached_property
+from google.api_core import exceptions as google_api_exceptions
 from google.cloud import exceptions as google_cloud_exceptions
 from google.cloud import pubsub
+from google.cloud.pubsub_v1.subscriber import scheduler as subscriber_scheduler
+from google.pubsub_v1.services.publisher import transports as publisher_transports
+from google.pubsub_v1.services.subscriber import transports as subscriber_transports
 
 from queue_messaging import exceptions
-from queue_messaging import utils
 from queue_messaging.data import structures
 
 logger = logging.getLogger(__name__)
@@ -18,6 +23,10 @@ def get_pubsub_client(queue_config):
         subscription_name=queue_config.SUBSCRIPTION,
         pubsub_emulator_host=queue_config.PUBSUB_EMULATOR_HOST,
         project_id=queue_config.PROJECT_ID,
+        credentials=queue_config.CREDENTIALS,
+        batch_settings=get_batch_settings(queue_config),
+        flow_control=get_flow_control(queue_config),
+        max_workers=queue_config.CONSUMER_MAX_WORKERS,
     )
 
 
@@ -27,9 +36,37 @@ def get_fallback_pubsub_client(queue_config):
         subscription_name=queue_config.SUBSCRIPTION,
         pubsub_emulator_host=queue_config.PUBSUB_EMULATOR_HOST,
         project_id=queue_config.PROJECT_ID,
+        credentials=queue_config.CREDENTIALS,
+        batch_settings=get_batch_settings(queue_config),
     )
 
 
+def get_batch_settings(queue_config):
+    settings = {
+        'max_messages': queue_config.PUBLISH_BATCH_MAX_MESSAGES,
+        'max_bytes': queue_config.PUBLISH_BATCH_MAX_BYTES,
+        'max_latency': queue_config.PUBLISH_BATCH_MAX_LATENCY,
+    }
+    settings = {key: value for key, value in settings.items() if value is not None}
+    if settings:
+        return pubsub.types.BatchSettings(**settings)
+    else:
+        return None
+
+
+def get_flow_control(queue_config):
+    settings = {
+        'max_messages': queue_config.CONSUMER_MAX_MESSAGES,
+        'max_bytes': queue_config.CONSUMER_MAX_BYTES,
+        'max_lease_duration': queue_config.CONSUMER_MAX_LEASE_DURATION,
+    }
+    settings = {key: value for key, value in settings.items() if value is not None}
+    if settings:
+        return pubsub.types.FlowControl(**settings)
+    else:
+        return None
+
+
 retry = tenacity.retry(
     retry=tenacity.retry_if_exception_type(
         (ConnectionError, google_cloud_exceptions.GoogleCloudError)
@@ -39,55 +76,207 @@ retry = tenacity.retry(
 )
 
 
+class ClientPool:
+    """Process wide pool of Pub/Sub clients, each owning its own channel.
+
+    Publisher clients are shared by all `PubSub` instances with the same
+    emulator host, credentials and batch settings; subscriber clients by
+    the same emulator host and credentials.
+    """
+    def __init__(self):
+        self._publishers = {}
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def get_publisher(self, emulator_host=None, credentials=None, batch_settings=None):
+        key = (emulator_host, credentials, batch_settings)
+        with self._lock:
+            if key not in self._publishers:
+                self._publishers[key] = self._create_publisher(
+                    emulator_host, credentials, batch_settings)
+            return self._publishers[key]
+
+    def get_subscriber(self, emulator_host=None, credentials=None):
+        key = (emulator_host, credentials)
+        with self._lock:
+            if key not in self._subscribers:
+                self._subscribers[key] = self._create_subscriber(emulator_host, credentials)
+            return self._subscribers[key]
+
+    def shutdown(self):
+        """Flush and stop the publishers and close the subscribers."""
+        with self._lock:
+            publishers, self._publishers = self._publishers, {}
+            subscribers, self._subscribers = self._subscribers, {}
+        for publisher in publishers.values():
+            stop = getattr(publisher, 'stop', None)
+            if stop is not None:
+                stop()
+        for subscriber in subscribers.values():
+            close = getattr(subscriber, 'close', None)
+            if close is not None:
+                close()
+
+    def clear(self):
+        with self._lock:
+            self._publishers = {}
+            self._subscribers = {}
+
+    @classmethod
+    def _create_publisher(cls, emulator_host, credentials, batch_settings):
+        options = cls._get_connection_options(
+            emulator_host, credentials, publisher_transports.PublisherGrpcTransport)
+        if batch_settings is not None:
+            options['batch_settings'] = batch_settings
+        return pubsub.PublisherClient(**options)
+
+    @classmethod
+    def _create_subscriber(cls, emulator_host, credentials):
+        options = cls._get_connection_options(
+            emulator_host, credentials, subscriber_transports.SubscriberGrpcTransport)
+        return pubsub.SubscriberClient(**options)
+
+    @staticmethod
+    def _get_connection_options(emulator_host, credentials, transport_class):
+        """Connect to the emulator through an explicit insecure channel.
+
+        This is what the client library does when `PUBSUB_EMULATOR_HOST` is
+        set, without depending on (or mutating) the process environment.
+        """
+        if emulator_host:
+            channel = grpc.insecure_channel(target=emulator_host)
+            return {'transport': transport_class(channel=channel)}
+        elif credentials is not None:
+            return {'credentials': credentials}
+        else:
+            return {}
+
+
+client_pool = ClientPool()
+
+
+def shutdown():
+    client_pool.shutdown()
+
+
 class Client:
-    @cached_property
+    def __init__(self, emulator_host=None, credentials=None, batch_settings=None,
+                 pool=client_pool):
+        self.emulator_host = emulator_host
+        self.credentials = credentials
+        self.batch_settings = batch_settings
+        self.pool = pool
+
+    @property
     def publisher(self):
-        return pubsub.PublisherClient()
+        return self.pool.get_publisher(
+            self.emulator_host, self.credentials, self.batch_settings)
 
-    @cached_property
+    @property
     def subscriber(self):
-        return pubsub.SubscriberClient()
+        return self.pool.get_subscriber(self.emulator_host, self.credentials)
 
 
 class PubSub:
     def __init__(self,
                  topic_name, project_id,
                  subscription_name=None,
-                 pubsub_emulator_host=None):
-        self.topic_name = topic_name
-        self.subscription_name = subscription_name
+                 pubsub_emulator_host=None,
+                 credentials=None,
+                 batch_settings=None,
+                 flow_control=None,
+                 max_workers=None,
+                 client=None):
+        self._topic_name = topic_name
+        self._subscription_name = subscription_name
+        self._project_id = project_id
+        self._topic_path = None
+        self._subscription_path = None
         self.pubsub_emulator_host = pubsub_emulator_host
-        self.project_id = project_id
-        self.client = Client()
+        self.flow_control = flow_control
+        self.max_workers = max_workers
+        self.client = client or Client(
+            emulator_host=pubsub_emulator_host, credentials=credentials,
+            batch_settings=batch_settings)
+
+    @property
+    def topic_name(self):
+        return self._topic_name
+
+    @topic_name.setter
+    def topic_name(self, value):
+        self._topic_name = value
+        self._topic_path = None
+
+    @property
+    def subscription_name(self):
+        return self._subscription_name
+
+    @subscription_name.setter
+    def subscription_name(self, value):
+        self._subscription_name = value
+        self._subscription_path = None
+
+    @property
+    def project_id(self):
+        return self._project_id
+
+    @project_id.setter
+    def project_id(self, value):
+        self._project_id = value
+        self._topic_path = None
+        self._subscription_path = None
+
+    @property
+    def topic_path(self):
+        if self._topic_path is None:
+            self._topic_path = self._get_topic_path()
+        return self._topic_path
+
+    @property
+    def subscription_path(self):
+        if self._subscription_path is None:
+            self._subscription_path = self._get_subscription_path()
+        return self._subscription_path
 
     @property
     def publisher(self):
-        if self.pubsub_emulator_host:
-            with utils.EnvironmentContext('PUBSUB_EMULATOR_HOST', self.pubsub_emulator_host):
-                return self.client.publisher
-        else:
-            return self.client.publisher
+        return self.client.publisher
 
     def subscriber(self, callback):
-        if self.pubsub_emulator_host:
-            with utils.EnvironmentContext('PUBSUB_EMULATOR_HOST', self.pubsub_emulator_host):
-                return self._subscriber(callback)
-        else:
-            return self._subscriber(callback)
+        subscription = self.subscription_path
+        return self.client.subscriber.subscribe(
+            subscription, callback, **self._get_subscribe_options())
+
+    def _subscriber_pull(self, max_messages, timeout):
+        options = {}
+        if timeout is not None:
+            options['timeout'] = timeout
+        return self.client.subscriber.pull(
+            subscription=self.subscription_path, max_messages=max_messages, **options)
 
-    def _subscriber(self, callback):
-        subscription = self._get_subscription_path()
-        return self.client.subscriber.subscribe(subscription, callback)
+    def _get_subscribe_options(self):
+        options = {}
+        if self.flow_control is not None:
+            options['flow_control'] = self.flow_control
+        if self.max_workers is not None:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+            options['scheduler'] = subscriber_scheduler.ThreadScheduler(executor=executor)
+        return options
 
     def _get_subscription_path(self):
         return self.client.subscriber.subscription_path(self.project_id, self.subscription_name)
 
-    @retry
-    def send(self, message: str, **attributes):
+    def send(self, message, **attributes):
         logger.debug('sending message')
-        topic = self._get_topic_path()
-        bytes_payload = message.encode('utf-8')
-        return self.publisher.publish(topic, bytes_payload, **attributes)
+        topic = self.topic_path
+        if isinstance(message, bytes):
+            bytes_payload = message
+        else:
+            bytes_payload = message.encode('utf-8')
+        # Retries are left to `queue_messaging.retrying`, so a failed publish
+        # is not retried by the client library first.
+        return self.publisher.publish(topic, bytes_payload, retry=None, **attributes)
 
     def _get_topic_path(self):
         return self.client.publisher.topic_path(self.project_id, self.topic_name)
@@ -95,19 +284,70 @@ class PubSub:
     @retry
     def receive(self, callback):
         logger.debug('pulling receive message')
+        future = self.subscribe(callback)
+        if future:
+            future.result()
+
+    def subscribe(self, callback):
+        """Start receiving messages in the background.
+
+        Returns the streaming pull future, which can be cancelled to stop.
+        """
         try:
-            future = self.subscriber(lambda message: self.process_message(message, callback))
+            return self.subscriber(lambda message: self.process_message(message, callback))
         except google_cloud_exceptions.NotFound as e:
             raise exceptions.PubSubError('Error while pulling a message.', errors=e)
-        else:
-            if future:
-                future.result()
 
     @staticmethod
     def process_message(message, callback):
-        logger.debug('Processing message', extra={
-            'data': message.data.decode('utf-8'), 'message_id': message.message_id
-        })
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Processing message', extra={
+                'data': message.data.decode('utf-8', errors='replace'),
+                'message_id': message.message_id,
+            })
         callback(structures.PulledMessage(
-            ack=message.ack, data=message.data.decode('utf-8'),
-            message_id=message.message_id, attributes=message.attributes))
+            ack=message.ack, data=message.data,
+            message_id=message.message_id, attributes=message.attributes,
+            nack=message.nack, modify_ack_deadline=message.modify_ack_deadline))
+
+    @retry
+    def pull(self, max_messages, timeout=None):
+        """Synchronously pull up to `max_messages` messages.
+
+        Returns an empty list when no message arrived within `timeout` seconds.
+        """
+        logger.debug('pulling messages')
+        try:
+            response = self._subscriber_pull(max_messages, timeout)
+        except google_cloud_exceptions.NotFound as e:
+            raise exceptions.PubSubError('Error while pulling a message.', errors=e)
+        except google_api_exceptions.DeadlineExceeded:
+            return []
+        return [
+            self._create_pulled_message(received_message)
+            for received_message in response.received_messages
+        ]
+
+    def _create_pulled_message(self, received_message):
+        ack_id = received_message.ack_id
+        message = received_message.message
+        return structures.PulledMessage(
+            ack=lambda: self.acknowledge([ack_id]),
+            data=message.data,
+            message_id=message.message_id,
+            attributes=dict(message.attributes),
+            nack=lambda: self.modify_ack_deadline([ack_id], 0),
+            modify_ack_deadline=lambda seconds: self.modify_ack_deadline([ack_id], seconds),
+            ack_id=ack_id,
+        )
+
+    def acknowledge(self, ack_ids):
+        if ack_ids:
+            self.client.subscriber.acknowledge(
+                subscription=self.subscription_path, ack_ids=list(ack_ids))
+
+    def modify_ack_deadline(self, ack_ids, seconds):
+        if ack_ids:
+            self.client.subscriber.modify_ack_deadline(
+                subscription=self.subscription_path, ack_ids=list(ack_ids),
+                ack_deadline_seconds=seconds)
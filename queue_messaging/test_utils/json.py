@@ -2,11 +2,14 @@ import json
 
 
 class StringComparableJson:
-    def __init__(self, json):
+    def __init__(self, json, encoding='utf-8'):
         self.json = json
+        self.encoding = encoding
 
     def __eq__(self, json_string):
-        if isinstance(json_string, str):
+        if isinstance(json_string, bytes):
+            return self.json == json.loads(json_string.decode(self.encoding))
+        elif isinstance(json_string, str):
             return self.json == json.loads(json_string)
         else:
             return self.json == json_string
@@ -1,4 +1,6 @@
 from .environment_context import EnvironmentContext
+from .futures import aggregate, wrap_in_asyncio_future
+from .scheduling import Scheduler
 
 
-__all__ = [EnvironmentContext, ]
+__all__ = [EnvironmentContext, aggregate, wrap_in_asyncio_future, Scheduler]
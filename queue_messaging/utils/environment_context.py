@@ -14,7 +14,7 @@ class EnvironmentContext(object):
         os.environ[self.key] = self.newValue
 
     def __exit__(self, *args):
-        if self.oldValue:
+        if self.oldValue is not None:
             os.environ[self.key] = self.oldValue
         else:
             del os.environ[self.key]
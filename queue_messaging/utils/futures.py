@@ -0,0 +1,60 @@
+import concurrent.futures
+import threading
+
+
+def aggregate(futures):
+    """Combine futures into a single one resolving to the list of their results.
+
+    The aggregate future fails with the first exception raised by any of
+    the combined futures, once all of them are done.
+    """
+    futures = list(futures)
+    aggregated = concurrent.futures.Future()
+    aggregated.set_running_or_notify_cancel()
+    if not futures:
+        aggregated.set_result([])
+        return aggregated
+    lock = threading.Lock()
+    remaining = [len(futures)]
+
+    def on_done(_):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        _resolve(aggregated, futures)
+
+    for future in futures:
+        future.add_done_callback(on_done)
+    return aggregated
+
+
+def _resolve(aggregated, futures):
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            aggregated.set_exception(e)
+            return
+    aggregated.set_result(results)
+
+
+def wrap_in_asyncio_future(future, loop):
+    """Wrap any future supporting `add_done_callback` for awaiting in `loop`.
+
+    Unlike `asyncio.wrap_future` it works with the client library futures,
+    which are not necessarily `concurrent.futures.Future` instances.
+    """
+    asyncio_future = loop.create_future()
+
+    def copy_state(_):
+        if asyncio_future.cancelled():
+            return
+        try:
+            asyncio_future.set_result(future.result())
+        except Exception as e:
+            asyncio_future.set_exception(e)
+
+    future.add_done_callback(lambda _: loop.call_soon_threadsafe(copy_state, future))
+    return asyncio_future
@@ -0,0 +1,51 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class Scheduler:
+    """Runs delayed calls on a single daemon thread, started on first use."""
+    def __init__(self, name='queue-messaging-scheduler'):
+        self._name = name
+        self._queue = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def schedule(self, delay, function):
+        with self._condition:
+            heapq.heappush(
+                self._queue, (time.monotonic() + delay, next(self._counter), function))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            function = self._wait_for_next()
+            try:
+                function()
+            except Exception:
+                logger.exception('Error in scheduled call')
+
+    def _wait_for_next(self):
+        with self._condition:
+            while True:
+                if not self._queue:
+                    self._condition.wait()
+                    continue
+                when = self._queue[0][0]
+                now = time.monotonic()
+                if when > now:
+                    self._condition.wait(when - now)
+                    continue
+                return heapq.heappop(self._queue)[2]
+
+
+default_scheduler = Scheduler()
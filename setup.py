@@ -13,10 +13,20 @@ setup(
     author='Social WiFi',
     author_email='it@socialwifi.com',
     url='https://github.com/socialwifi/queue-messaging',
-    packages=find_packages(exclude=['tests']),
+    packages=find_packages(exclude=['tests', 'benchmarks']),
     install_requires=[str(ir.req) for ir in parse_requirements('base_requirements.txt', session=False)],
+    extras_require={
+        'cbor': ['cbor2'],
+        'lz4': ['lz4'],
+        'msgpack': ['msgpack'],
+        'orjson': ['orjson'],
+        'rapidjson': ['python-rapidjson'],
+        'ujson': ['ujson'],
+        'zstd': ['zstandard'],
+    },
     setup_requires=['pytest-runner'],
     tests_require=['pytest'],
+    python_requires='>=3.7',
     license='BSD',
     classifiers=[
         'Development Status :: 5 - Production/Stable',
@@ -26,7 +36,10 @@ setup(
         'Operating System :: OS Independent',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
     ]
 )
@@ -0,0 +1,10 @@
+import pytest
+
+from queue_messaging.services import pubsub
+
+
+@pytest.fixture(autouse=True)
+def clear_client_pool():
+    pubsub.client_pool.clear()
+    yield
+    pubsub.client_pool.clear()
@@ -0,0 +1,39 @@
+import pytest
+
+from queue_messaging import exceptions
+from queue_messaging.data import codecs
+
+
+@pytest.fixture(params=[
+    codecs.JSON_CONTENT_TYPE, codecs.MSGPACK_CONTENT_TYPE, codecs.CBOR_CONTENT_TYPE,
+])
+def codec(request):
+    payload_codecs = codecs.Codecs()
+    try:
+        return payload_codecs.get(request.param)
+    except exceptions.DecodingError:
+        pytest.skip('{} codec is not installed'.format(request.param))
+
+
+class TestCodecs:
+    def test_integration(self, codec):
+        data = {'string_field': 'zażółć', 'int_field': 1, 'none_field': None}
+        encoded = codec.dumps(data)
+        assert isinstance(encoded, bytes)
+        assert codec.loads(encoded) == data
+
+    def test_loads_invalid_data(self, codec):
+        with pytest.raises(ValueError):
+            codec.loads(b'\xc1invalid')
+
+    def test_none_content_type_selects_json(self):
+        payload_codecs = codecs.Codecs()
+        assert payload_codecs.get(None) is payload_codecs.json
+
+    def test_unknown_content_type(self):
+        with pytest.raises(exceptions.DecodingError):
+            codecs.Codecs().get('application/xml')
+
+    def test_unknown_content_type_for_publishing(self):
+        with pytest.raises(exceptions.ConfigurationError):
+            codecs.Codecs().get_for_publishing('application/xml')
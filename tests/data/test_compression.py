@@ -0,0 +1,57 @@
+import pytest
+
+from queue_messaging import exceptions
+from queue_messaging.data import compression
+
+
+@pytest.fixture(params=['zlib', 'zstd', 'lz4'])
+def compressor(request):
+    if compression.COMPRESSORS[request.param][1] is None:
+        pytest.skip('{} is not installed'.format(request.param))
+    return compression.get_compressor(request.param)
+
+
+class TestCompress:
+    def test_integration(self, compressor):
+        payload = b'{"field": "value"}' * 100
+        compressed, attributes = compression.compress(payload, {'type': 'A'}, compressor, 10)
+        assert len(compressed) < len(payload)
+        assert attributes == {'type': 'A', 'content_encoding': compressor.name}
+        assert compression.decompress(compressed, attributes['content_encoding']) == payload
+
+    def test_if_payload_below_threshold_is_not_compressed(self, compressor):
+        payload = b'{"field": "value"}' * 100
+        result = compression.compress(payload, {'type': 'A'}, compressor, len(payload))
+        assert result == (payload, {'type': 'A'})
+
+    def test_if_incompressible_payload_is_sent_as_is(self, compressor):
+        payload = b'\x8f'
+        result = compression.compress(payload, {'type': 'A'}, compressor, 0)
+        assert result == (payload, {'type': 'A'})
+
+    def test_if_nothing_is_compressed_without_compressor(self):
+        payload = b'{"field": "value"}' * 100
+        result = compression.compress(payload, {'type': 'A'}, None, 0)
+        assert result == (payload, {'type': 'A'})
+
+
+class TestDecompress:
+    def test_without_content_encoding(self):
+        assert compression.decompress(b'data', None) == b'data'
+
+    def test_invalid_data(self, compressor):
+        with pytest.raises(exceptions.DecodingError):
+            compression.decompress(b'invalid data', compressor.name)
+
+    def test_unknown_content_encoding(self):
+        with pytest.raises(exceptions.DecodingError):
+            compression.decompress(b'data', 'brotli')
+
+
+class TestGetCompressor:
+    def test_none(self):
+        assert compression.get_compressor(None) is None
+
+    def test_unknown(self):
+        with pytest.raises(exceptions.ConfigurationError):
+            compression.get_compressor('brotli')
@@ -9,6 +9,8 @@ import datetime
 from queue_messaging import exceptions
 from queue_messaging.data import structures
 from queue_messaging.data import encoding
+from queue_messaging.data import codecs
+from queue_messaging.data import json_engines
 
 
 class FancyEventSchema(marshmallow.Schema):
@@ -38,6 +40,20 @@ def test_encoding_payload_valid():
             == json.loads('{"string_field": "123456789", "uuid_field": "72d9a041-f401-42b6-8556-72b3c00e43d8"}'))
 
 
+def test_encoding_payload_with_json_engine():
+    json_engine = mock.Mock(wraps=json_engines.StdlibEngine())
+    data = FancyEvent(
+        string_field='123456789',
+        uuid_field=uuid.UUID('72d9a041-f401-42b6-8556-72b3c00e43d8'),
+    )
+    encoded_data = encoding.encode(model=data, codec=codecs.JSONCodec(json_engine))
+    assert isinstance(encoded_data, bytes)
+    json_engine.dumps.assert_called_with({
+        'string_field': '123456789',
+        'uuid_field': '72d9a041-f401-42b6-8556-72b3c00e43d8',
+    })
+
+
 def test_if_encode_raises_exception_with_invalid_data_and_strict_schema():
     class StrictSchema(marshmallow.Schema):
         uuid_field = fields.UUID(required=True)
@@ -90,6 +106,7 @@ def test_create_attributes():
     assert attributes == {
         'type': 'FancyEvent',
         'timestamp': '2016-12-10T11:15:45.000000Z',
+        'content_type': 'application/json',
     }
 
 
@@ -105,6 +122,7 @@ def test_create_attributes_uses_current_date_for_timestamp(get_now_with_utc_time
     assert attributes == {
         'type': 'FancyEvent',
         'timestamp': '2016-12-10T11:15:45.000000Z',
+        'content_type': 'application/json',
     }
 
 
@@ -124,6 +142,8 @@ def test_create_attributes_raises_error_when_no_type_present():
 def test_payload_decoder_valid():
     header = mock.Mock(
         type='FancyEvent',
+        content_type='application/json',
+        content_encoding=None,
     )
     encoded_payload = '{"uuid_field": "72d9a041-f401-42b6-8556-72b3c00e43d8", "string_field": "123456789"}'
     message_config = {
@@ -136,6 +156,60 @@ def test_payload_decoder_valid():
     )
 
 
+def test_payload_decoder_selects_codec_from_header():
+    msgpack = pytest.importorskip('msgpack')
+    header = structures.Header(
+        type='FancyEvent',
+        timestamp=None,
+        content_type='application/msgpack',
+    )
+    encoded_payload = msgpack.packb({
+        'uuid_field': '72d9a041-f401-42b6-8556-72b3c00e43d8',
+        'string_field': '123456789',
+    })
+    result = encoding.decode_payload(
+        header=header,
+        encoded_data=encoded_payload,
+        message_config={'FancyEvent': FancyEvent},
+    )
+    assert result == FancyEvent(
+        uuid_field=uuid.UUID('72d9a041-f401-42b6-8556-72b3c00e43d8'),
+        string_field='123456789',
+    )
+
+
+def test_payload_decoder_unknown_content_type():
+    header = structures.Header(
+        type='FancyEvent',
+        timestamp=None,
+        content_type='application/xml',
+    )
+    with pytest.raises(exceptions.DecodingError):
+        encoding.decode_payload(
+            header=header,
+            encoded_data=b'<xml/>',
+            message_config={'FancyEvent': FancyEvent},
+        )
+
+
+def test_create_header():
+    header = encoding.create_header({
+        'type': 'FancyEvent',
+        'timestamp': '2016-12-10T11:15:45.123456Z',
+        'content_type': 'application/msgpack',
+    })
+    assert header.type == 'FancyEvent'
+    assert header.content_type == 'application/msgpack'
+
+
+def test_create_header_defaults_to_json_content_type():
+    header = encoding.create_header({
+        'type': 'FancyEvent',
+        'timestamp': '2016-12-10T11:15:45.123456Z',
+    })
+    assert header.content_type == 'application/json'
+
+
 def test_payload_decoder_invalid_header():
     header = mock.Mock(
         type='NonExistingEvent'
@@ -155,6 +229,8 @@ def test_payload_decoder_invalid_header():
 def test_payload_decoder_invalid_data():
     header = mock.Mock(
         type='FancyEvent',
+        content_type='application/json',
+        content_encoding=None,
     )
     encoded_payload = 'invalid data'
     message_config = {
@@ -171,6 +247,8 @@ def test_payload_decoder_invalid_data():
 def test_payload_decoder_empty_data():
     header = mock.Mock(
         type='FancyEvent',
+        content_type='application/json',
+        content_encoding=None,
     )
     encoded_payload = '{}'
     message_config = {
@@ -209,6 +287,16 @@ class TestDecode:
             string_field='123456789'
         )
 
+    def test_if_works_with_bytes_and_json_engine(self, event_class):
+        json_engine = mock.Mock(wraps=json_engines.StdlibEngine())
+        data = b'{"uuid_field": "72d9a041-f401-42b6-8556-72b3c00e43d8"}'
+        result = encoding.decode(
+            type=event_class, encoded_data=data, codec=codecs.JSONCodec(json_engine))
+        assert result == event_class(
+            uuid_field=uuid.UUID('72d9a041-f401-42b6-8556-72b3c00e43d8')
+        )
+        json_engine.loads.assert_called_with(data)
+
     def test_if_works_when_optional_field_is_missing(self, event_class):
         data = '{"uuid_field": "72d9a041-f401-42b6-8556-72b3c00e43d8"}'
         result = encoding.decode(type=event_class, encoded_data=data)
@@ -292,6 +380,33 @@ class TestDatetimeRfc3339Encoding:
         assert decoded == datetime.datetime(2016, 12, 10, 11, 15, 45, 123456,
                                             tzinfo=datetime.timezone.utc)
 
+    def test_encoding_consecutive_seconds(self):
+        first = datetime.datetime(2016, 12, 10, 11, 15, 45, 123456)
+        second = datetime.datetime(2016, 12, 10, 11, 15, 46, 5)
+        assert encoding.datetime_to_rfc3339_string(first) == '2016-12-10T11:15:45.123456Z'
+        assert encoding.datetime_to_rfc3339_string(second) == '2016-12-10T11:15:46.000005Z'
+        assert encoding.datetime_to_rfc3339_string(first) == '2016-12-10T11:15:45.123456Z'
+
+    def test_decoding_strings_within_same_second(self):
+        assert encoding.rfc3339_string_to_datetime(
+            '2016-12-10T11:15:45.000001Z').microsecond == 1
+        assert encoding.rfc3339_string_to_datetime(
+            '2016-12-10T11:15:45.999999Z').microsecond == 999999
+
+    def test_decoding_short_fraction(self):
+        decoded = encoding.rfc3339_string_to_datetime('2016-12-10T11:15:45.5Z')
+        assert decoded.microsecond == 500000
+
+    def test_decoding_invalid_date(self):
+        with pytest.raises(ValueError) as excinfo:
+            encoding.rfc3339_string_to_datetime('2016-02-30T11:15:45.123456Z')
+        assert str(excinfo.value) == 'day is out of range for month'
+
+    def test_decoding_invalid_fraction_after_cached_second(self):
+        encoding.rfc3339_string_to_datetime('2016-12-10T11:15:45.123456Z')
+        with pytest.raises(ValueError):
+            encoding.rfc3339_string_to_datetime('2016-12-10T11:15:45.12345xZ')
+
     def test_decoding_invalid_string(self):
         input = '2016-12-10T11:15:45.123456+00:00'
         with pytest.raises(ValueError) as excinfo:
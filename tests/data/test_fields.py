@@ -84,3 +84,45 @@ class TestMACAddressField:
         with pytest.raises(marshmallow.ValidationError) as e:
             field.deserialize(value)
         assert str(e.value) == "Field may not be null."
+
+    def test_serialization_with_bare_mac(self, model):
+        field = fields.MACAddressField()
+        model.mac = '78F882B2E55A'
+        assert field.serialize('mac', model) == '78:f8:82:b2:e5:5a'
+
+    def test_serialization_with_cisco_dialect(self, model):
+        field = fields.MACAddressField()
+        model.mac = '78f8.82b2.e55a'
+        assert field.serialize('mac', model) == '78:f8:82:b2:e5:5a'
+
+    def test_serialization_does_not_change_eui(self, model):
+        field = fields.MACAddressField()
+        model.mac = netaddr.EUI('78-F8-82-B2-E5-5A', dialect=netaddr.mac_eui48)
+        field.serialize('mac', model)
+        assert model.mac.dialect == netaddr.mac_eui48
+
+    def test_deserialization_returns_eui_in_right_dialect(self):
+        field = fields.MACAddressField()
+        value = netaddr.EUI('78-F8-82-B2-E5-5A', dialect=netaddr.mac_unix_expanded)
+        assert field.deserialize(value) is value
+
+    def test_deserialization_copies_eui_in_different_dialect(self):
+        field = fields.MACAddressField()
+        value = netaddr.EUI('78-F8-82-B2-E5-5A', dialect=netaddr.mac_eui48)
+        deserialized = field.deserialize(value)
+        assert deserialized == value
+        assert deserialized.dialect == netaddr.mac_unix_expanded
+        assert value.dialect == netaddr.mac_eui48
+
+    def test_deserialization_with_cache(self):
+        field = fields.MACAddressField(cache_size=2)
+        first = field.deserialize('78-F8-82-B2-E5-5A')
+        second = field.deserialize('78-F8-82-B2-E5-5A')
+        assert first == second
+        assert first is not second
+        assert field._parse.cache_info().hits == 1
+
+    def test_deserialization_with_invalid_data_and_cache(self):
+        field = fields.MACAddressField(cache_size=2)
+        with pytest.raises(marshmallow.ValidationError):
+            field.deserialize('random string')
@@ -0,0 +1,48 @@
+from unittest import mock
+
+import pytest
+
+from queue_messaging import exceptions
+from queue_messaging.data import json_engines
+
+
+@pytest.fixture(params=['json', 'orjson', 'rapidjson', 'ujson'])
+def engine(request):
+    if json_engines.ENGINES[request.param][1] is None:
+        pytest.skip('{} is not installed'.format(request.param))
+    return json_engines.get_engine(request.param)
+
+
+class TestEngines:
+    def test_dumps_returns_bytes(self, engine):
+        assert engine.loads(engine.dumps({'field': 'zażółć'})) == {'field': 'zażółć'}
+        assert isinstance(engine.dumps({}), bytes)
+
+    def test_loads_from_str(self, engine):
+        assert engine.loads('{"field": 1}') == {'field': 1}
+
+    def test_loads_invalid_data(self, engine):
+        with pytest.raises(ValueError):
+            engine.loads(b'invalid data')
+
+
+class TestGetEngine:
+    def test_default(self):
+        assert json_engines.get_engine() is json_engines.default_engine
+
+    def test_auto_falls_back_to_stdlib(self):
+        with mock.patch.dict(json_engines.ENGINES, {
+            'orjson': (json_engines.OrjsonEngine, None),
+            'rapidjson': (json_engines.RapidjsonEngine, None),
+            'ujson': (json_engines.UjsonEngine, None),
+        }):
+            assert isinstance(json_engines.get_engine('auto'), json_engines.StdlibEngine)
+
+    def test_unknown_engine(self):
+        with pytest.raises(exceptions.ConfigurationError):
+            json_engines.get_engine('yaml')
+
+    def test_missing_engine(self):
+        with mock.patch.dict(json_engines.ENGINES, {'ujson': (json_engines.UjsonEngine, None)}):
+            with pytest.raises(exceptions.ConfigurationError):
+                json_engines.get_engine('ujson')
@@ -0,0 +1,37 @@
+from unittest import mock
+
+import marshmallow
+from marshmallow import fields
+
+from queue_messaging.data import schemas
+
+
+class FancySchema(marshmallow.Schema):
+    uuid_field = fields.UUID(required=True)
+    string_field = fields.String(required=False)
+
+
+class TestRegistry:
+    def test_if_schema_is_created_once(self):
+        registry = schemas.Registry()
+        schema_class = mock.Mock(return_value=FancySchema())
+        first = registry.get_schema(schema_class)
+        second = registry.get_schema(schema_class)
+        assert first is second
+        assert schema_class.call_count == 1
+
+    def test_get_fields(self):
+        registry = schemas.Registry()
+        schema_fields = registry.get_fields(FancySchema)
+        assert schema_fields.names == {'uuid_field', 'string_field'}
+        assert schema_fields.required == {'uuid_field'}
+        assert schema_fields.fields is registry.get_schema(FancySchema).fields
+
+    def test_register(self):
+        class FancyModel:
+            class Meta:
+                schema = FancySchema
+
+        registry = schemas.Registry()
+        registry.register(FancyModel)
+        assert registry.get_fields(FancySchema).names == {'uuid_field', 'string_field'}
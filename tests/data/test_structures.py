@@ -48,3 +48,41 @@ def test_if_creating_model_with_missing_required_field_raises_exception():
             string_field='aaa',
         )
     assert str(excinfo.value) == "Missing required fields '{'uuid_field'}'"
+
+
+def test_if_model_uses_slots():
+    model = FancyModel(uuid_field=1)
+    assert set(FancyModel.__slots__) == {'uuid_field', 'string_field'}
+    assert not hasattr(model, '__dict__')
+
+
+def test_if_slots_can_be_disabled():
+    class DictModel(structures.Model):
+        class Meta:
+            schema = FancyModelSchema
+            slots = False
+
+    model = DictModel(uuid_field=1)
+    model.extra = 'allowed'
+    assert model.extra == 'allowed'
+
+
+def test_if_subclass_inherits_fields():
+    class ChildModel(FancyModel):
+        pass
+
+    model = ChildModel(uuid_field=1, string_field='a')
+    assert model.string_field == 'a'
+    assert not hasattr(model, '__dict__')
+
+
+def test_equality():
+    assert FancyModel(uuid_field=1, string_field='a') == FancyModel(uuid_field=1, string_field='a')
+    assert FancyModel(uuid_field=1, string_field='a') != FancyModel(uuid_field=1, string_field='b')
+
+
+def test_repr():
+    model = FancyModel(uuid_field=1, string_field='a')
+    assert repr(model).startswith('<FancyModel(')
+    assert "string_field='a'" in repr(model)
+    assert 'uuid_field=1' in repr(model)
@@ -0,0 +1,147 @@
+import threading
+
+import pytest
+
+from queue_messaging import configuration
+from queue_messaging import exceptions
+from queue_messaging import services
+from queue_messaging.services import memory
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def broker(clock):
+    broker = memory.Broker(ack_deadline=10, clock=clock)
+    broker.create_subscription('a-subscription', 'a-topic')
+    return broker
+
+
+@pytest.fixture
+def client(broker):
+    return memory.Memory(
+        topic_name='a-topic', subscription_name='a-subscription', broker=broker)
+
+
+class TestMemory:
+    def test_send_and_pull(self, client):
+        future = client.send(b'data', type='FancyEvent')
+        pulled_messages = client.pull(10, timeout=0)
+        assert len(pulled_messages) == 1
+        assert pulled_messages[0].message_id == future.result()
+        assert pulled_messages[0].data == b'data'
+        assert pulled_messages[0].attributes == {'type': 'FancyEvent'}
+
+    def test_if_every_subscription_receives_message(self, broker, client):
+        broker.create_subscription('other-subscription', 'a-topic')
+        client.send(b'data')
+        other_client = memory.Memory(
+            topic_name='a-topic', subscription_name='other-subscription', broker=broker)
+        assert len(client.pull(10, timeout=0)) == 1
+        assert len(other_client.pull(10, timeout=0)) == 1
+
+    def test_pull_timeout(self, client):
+        assert client.pull(10, timeout=0.01) == []
+
+    def test_if_acknowledged_message_is_not_redelivered(self, client, clock):
+        client.send(b'data')
+        client.pull(10, timeout=0)[0].ack()
+        clock.now = 20
+        assert client.pull(10, timeout=0) == []
+
+    def test_if_message_is_redelivered_after_ack_deadline(self, client, clock):
+        client.send(b'data')
+        client.pull(10, timeout=0)
+        assert client.pull(10, timeout=0) == []
+        clock.now = 10
+        assert [message.data for message in client.pull(10, timeout=0)] == [b'data']
+
+    def test_if_extended_message_is_not_redelivered(self, client, clock):
+        client.send(b'data')
+        client.pull(10, timeout=0)[0].modify_ack_deadline(30)
+        clock.now = 20
+        assert client.pull(10, timeout=0) == []
+
+    def test_if_nacked_message_is_redelivered(self, client):
+        client.send(b'data')
+        client.pull(10, timeout=0)[0].nack()
+        assert len(client.pull(10, timeout=0)) == 1
+
+    def test_dead_letter_routing(self, broker):
+        broker.create_subscription(
+            'dl-source', 'source-topic', dead_letter_topic='dl-topic', max_delivery_attempts=2)
+        broker.create_subscription('dl-subscription', 'dl-topic')
+        client = memory.Memory(
+            topic_name='source-topic', subscription_name='dl-source', broker=broker)
+        dead_letter_client = memory.Memory(
+            topic_name='dl-topic', subscription_name='dl-subscription', broker=broker)
+        client.send(b'data')
+        client.pull(1, timeout=0)[0].nack()
+        client.pull(1, timeout=0)[0].nack()
+        assert client.pull(1, timeout=0) == []
+        assert [message.data for message in dead_letter_client.pull(1, timeout=0)] == [b'data']
+
+    def test_subscribe(self, client):
+        received = threading.Event()
+
+        def callback(message):
+            message.ack()
+            received.set()
+
+        future = client.subscribe(callback)
+        client.send(b'data')
+        assert received.wait(timeout=1)
+        future.cancel()
+
+    def test_if_failed_callback_nacks_message(self, client):
+        calls = []
+        redelivered = threading.Event()
+
+        def callback(message):
+            calls.append(message.message_id)
+            if len(calls) == 1:
+                raise ValueError
+            message.ack()
+            redelivered.set()
+
+        future = client.subscribe(callback)
+        client.send(b'data')
+        assert redelivered.wait(timeout=1)
+        future.cancel()
+
+    def test_unknown_subscription(self, broker):
+        client = memory.Memory(topic_name='a-topic', subscription_name='missing', broker=broker)
+        with pytest.raises(exceptions.QueueClientError):
+            client.pull(1)
+
+    def test_send_without_topic(self, broker):
+        client = memory.Memory(topic_name=None, broker=broker)
+        with pytest.raises(exceptions.QueueClientError):
+            client.send(b'data')
+
+
+class TestGetClients:
+    def test_memory_backend(self):
+        config = configuration.Factory({
+            'BACKEND': 'memory', 'TOPIC': 'a-topic', 'SUBSCRIPTION': 'a-subscription',
+            'DEAD_LETTER_TOPIC': 'dl-topic',
+        }).create()
+        client, dead_letter_client = services.get_clients(config)
+        assert isinstance(client, memory.Memory)
+        assert dead_letter_client.topic_name == 'dl-topic'
+
+    def test_unknown_backend(self):
+        config = configuration.Factory({'BACKEND': 'kafka'}).create()
+        with pytest.raises(exceptions.ConfigurationError):
+            services.get_clients(config)
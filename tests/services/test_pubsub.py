@@ -1,3 +1,4 @@
+import os
 from unittest import mock
 
 from google.cloud import exceptions as google_cloud_exceptions
@@ -42,16 +43,72 @@ class TestPubSub:
         topic_path_mock.return_value = 'projects/p_id/topics/a-publisher'
         client = pubsub.PubSub(topic_name='a-publisher', project_id='p_id')
         result = client.send(message='')
-        publish_mock.assert_called_with('projects/p_id/topics/a-publisher', b'')
+        publish_mock.assert_called_with('projects/p_id/topics/a-publisher', b'', retry=None)
         assert result == '123'
 
-    def test_retrying_send(self, publish_mock):
+    def test_send_leaves_retrying_to_publisher(self, publish_mock):
         publish_mock.side_effect = [
             ConnectionResetError, '123'
         ]
         client = pubsub.PubSub(topic_name='a-publisher', project_id='p_id')
-        result = client.send(message='')
-        assert result == '123'
+        with pytest.raises(ConnectionResetError):
+            client.send(message='')
+        assert publish_mock.call_count == 1
+
+    def test_receive_with_consumer_settings(self, pubsub_client_mock):
+        flow_control = pubsub.pubsub.types.FlowControl(max_messages=10)
+        client = pubsub.PubSub(
+            topic_name=mock.Mock(), project_id='', flow_control=flow_control, max_workers=2)
+        client.receive(callback=mock.Mock())
+        options = pubsub_client_mock.return_value.subscribe.call_args[1]
+        assert options['flow_control'] == flow_control
+        assert options['scheduler'] is not None
+
+    def test_pull(self, pubsub_client_mock):
+        subscriber = pubsub_client_mock.return_value
+        subscriber.subscription_path.return_value = 'projects/p_id/subscriptions/s'
+        subscriber.pull.return_value = mock.Mock(received_messages=[
+            mock.Mock(ack_id='ack-1', message=self.valid_response_factory(message_id=1)),
+        ])
+        client = pubsub.PubSub(topic_name='t', subscription_name='s', project_id='p_id')
+
+        pulled_messages = client.pull(10, timeout=5)
+
+        subscriber.pull.assert_called_with(
+            subscription='projects/p_id/subscriptions/s', max_messages=10, timeout=5)
+        assert [message.message_id for message in pulled_messages] == [1]
+        assert pulled_messages[0].ack_id == 'ack-1'
+        pulled_messages[0].ack()
+        subscriber.acknowledge.assert_called_with(
+            subscription='projects/p_id/subscriptions/s', ack_ids=['ack-1'])
+        pulled_messages[0].nack()
+        subscriber.modify_ack_deadline.assert_called_with(
+            subscription='projects/p_id/subscriptions/s', ack_ids=['ack-1'],
+            ack_deadline_seconds=0)
+
+    def test_pull_timeout(self, pubsub_client_mock):
+        pubsub_client_mock.return_value.pull.side_effect = (
+            pubsub.google_api_exceptions.DeadlineExceeded('timeout'))
+        client = pubsub.PubSub(topic_name='t', subscription_name='s', project_id='p_id')
+        assert client.pull(10, timeout=5) == []
+
+    def test_process_message_passes_data_through(self):
+        callback = mock.Mock()
+        message = self.valid_response_factory(message_id=1)
+        pubsub.PubSub.process_message(message, callback)
+        pulled_message = callback.call_args[0][0]
+        assert pulled_message.data is message.data
+        assert pulled_message.message_id == 1
+        assert pulled_message.attributes == message.attributes
+        assert pulled_message.nack == message.nack
+        assert pulled_message.modify_ack_deadline == message.modify_ack_deadline
+
+    def test_process_message_does_not_decode_data_without_debug_logging(self):
+        message = self.valid_response_factory(message_id=1)
+        message.data = mock.Mock()
+        with mock.patch.object(pubsub.logger, 'isEnabledFor', return_value=False):
+            pubsub.PubSub.process_message(message, mock.Mock())
+        assert not message.data.decode.called
 
     @staticmethod
     def valid_response_factory(*, message_id=1):
@@ -139,3 +196,91 @@ class TestRetry:
         ]
         decorated = pubsub.retry(mocked_function)
         pytest.raises(ConnectionRefusedError, decorated)
+
+
+class TestClientPool:
+    def test_if_publisher_is_shared(self, pubsub_publisher_client_mock):
+        main = pubsub.PubSub(topic_name='main', project_id='p_id')
+        dead_letter = pubsub.PubSub(topic_name='dead-letter', project_id='p_id')
+        assert main.publisher is dead_letter.publisher
+        assert pubsub_publisher_client_mock.call_count == 1
+
+    def test_if_different_settings_use_different_publishers(self, pubsub_publisher_client_mock):
+        pubsub_publisher_client_mock.side_effect = lambda **options: mock.Mock()
+        batch_settings = pubsub.pubsub.types.BatchSettings(max_messages=10)
+        default = pubsub.PubSub(topic_name='main', project_id='p_id')
+        batching = pubsub.PubSub(
+            topic_name='main', project_id='p_id', batch_settings=batch_settings)
+        assert default.publisher is not batching.publisher
+        pubsub_publisher_client_mock.assert_called_with(batch_settings=batch_settings)
+
+    def test_if_subscriber_is_shared(self, pubsub_client_mock):
+        first = pubsub.PubSub(topic_name='a', subscription_name='a', project_id='p_id')
+        second = pubsub.PubSub(topic_name='b', subscription_name='b', project_id='p_id')
+        assert first.client.subscriber is second.client.subscriber
+        assert pubsub_client_mock.call_count == 1
+
+    def test_shutdown(self, pubsub_publisher_client_mock, pubsub_client_mock):
+        client = pubsub.PubSub(topic_name='main', project_id='p_id')
+        publisher = client.publisher
+        subscriber = client.client.subscriber
+
+        pubsub.shutdown()
+
+        assert publisher.stop.called
+        assert subscriber.close.called
+        assert client.publisher is publisher
+        assert pubsub_publisher_client_mock.call_count == 2
+
+
+class TestEmulatorHost:
+    def test_if_publisher_connects_to_emulator_without_environment(
+            self, pubsub_publisher_client_mock):
+        def create_client(**options):
+            assert 'PUBSUB_EMULATOR_HOST' not in os.environ
+            return mock.Mock()
+
+        pubsub_publisher_client_mock.side_effect = create_client
+        with mock.patch.dict(os.environ, clear=True):
+            client = pubsub.PubSub(
+                topic_name='t', project_id='p_id', pubsub_emulator_host='localhost:8085')
+            client.send(message=b'data')
+        options = pubsub_publisher_client_mock.call_args[1]
+        assert isinstance(options['transport'], pubsub.publisher_transports.PublisherGrpcTransport)
+
+    def test_if_subscriber_connects_to_emulator(self, pubsub_client_mock):
+        client = pubsub.PubSub(
+            topic_name='t', subscription_name='s', project_id='p_id',
+            pubsub_emulator_host='localhost:8085')
+        client.receive(callback=mock.Mock())
+        options = pubsub_client_mock.call_args[1]
+        assert isinstance(
+            options['transport'], pubsub.subscriber_transports.SubscriberGrpcTransport)
+
+
+class TestResourcePaths:
+    def test_if_topic_path_is_cached(self, topic_path_mock, publish_mock):
+        topic_path_mock.return_value = 'projects/p_id/topics/a-publisher'
+        client = pubsub.PubSub(topic_name='a-publisher', project_id='p_id')
+        client.send(message=b'1')
+        client.send(message=b'2')
+        assert topic_path_mock.call_count == 1
+        publish_mock.assert_called_with('projects/p_id/topics/a-publisher', b'2', retry=None)
+
+    def test_if_topic_path_is_rebuilt_after_change(self, topic_path_mock):
+        topic_path_mock.side_effect = lambda project_id, topic_name: '{}/{}'.format(
+            project_id, topic_name)
+        client = pubsub.PubSub(topic_name='a', project_id='p_id')
+        assert client.topic_path == 'p_id/a'
+        client.topic_name = 'b'
+        assert client.topic_path == 'p_id/b'
+        client.project_id = 'other'
+        assert client.topic_path == 'other/b'
+
+    def test_if_subscription_path_is_rebuilt_after_change(self, pubsub_client_mock):
+        pubsub_client_mock.return_value.subscription_path.side_effect = (
+            lambda project_id, subscription_name: '{}/{}'.format(project_id, subscription_name))
+        client = pubsub.PubSub(topic_name='t', subscription_name='a', project_id='p_id')
+        assert client.subscription_path == 'p_id/a'
+        client.subscription_name = 'b'
+        assert client.subscription_path == 'p_id/b'
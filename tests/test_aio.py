@@ -0,0 +1,114 @@
+import asyncio
+import concurrent.futures
+import threading
+from unittest import mock
+
+import pytest
+
+from queue_messaging import aio
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def messaging():
+    return mock.Mock()
+
+
+class TestAsyncMessaging:
+    def test_send(self, loop, messaging):
+        publish_future = concurrent.futures.Future()
+        messaging.send.return_value = publish_future
+        async_messaging = aio.AsyncMessaging(messaging, loop=loop)
+
+        async def send():
+            awaitable = async_messaging.send(mock.sentinel.model)
+            threading.Thread(target=publish_future.set_result, args=('1',)).start()
+            return await awaitable
+
+        assert loop.run_until_complete(send()) == '1'
+        messaging.send.assert_called_with(mock.sentinel.model)
+
+    def test_send_failure(self, loop, messaging):
+        publish_future = concurrent.futures.Future()
+        publish_future.set_exception(ConnectionResetError())
+        messaging.send.return_value = publish_future
+        async_messaging = aio.AsyncMessaging(messaging, loop=loop)
+
+        with pytest.raises(ConnectionResetError):
+            loop.run_until_complete(async_messaging.send(mock.sentinel.model))
+
+    def test_receive(self, loop, messaging):
+        streaming_future = concurrent.futures.Future()
+        envelopes = [mock.Mock(), mock.Mock()]
+        handled = []
+
+        def subscribe(callback):
+            def deliver():
+                for envelope in envelopes:
+                    callback(envelope).result()
+                streaming_future.set_result(None)
+            threading.Thread(target=deliver).start()
+            return streaming_future
+
+        async def handler(envelope):
+            handled.append(envelope)
+            await envelope.acknowledge()
+
+        messaging.subscribe.side_effect = subscribe
+        async_messaging = aio.AsyncMessaging(messaging, loop=loop, max_concurrency=1)
+
+        loop.run_until_complete(async_messaging.receive(handler))
+
+        assert [envelope._envelope for envelope in handled] == envelopes
+        assert all(envelope.acknowledge.called for envelope in envelopes)
+
+    def test_if_failed_handler_nacks_message(self, loop, messaging):
+        streaming_future = concurrent.futures.Future()
+        envelope = mock.Mock()
+
+        def subscribe(callback):
+            def deliver():
+                callback(envelope).result()
+                streaming_future.set_result(None)
+            threading.Thread(target=deliver).start()
+            return streaming_future
+
+        async def handler(envelope):
+            raise ValueError()
+
+        messaging.subscribe.side_effect = subscribe
+        async_messaging = aio.AsyncMessaging(messaging, loop=loop)
+
+        loop.run_until_complete(async_messaging.receive(handler))
+
+        assert envelope.nack.called
+        assert not envelope.acknowledge.called
+
+
+class TestAsyncEnvelope:
+    def test_mark_as_dead_letter(self, loop):
+        dead_letter_future = concurrent.futures.Future()
+        dead_letter_future.set_result('1')
+        envelope = mock.Mock()
+        envelope.mark_as_dead_letter.return_value = dead_letter_future
+        async_envelope = aio.AsyncEnvelope(envelope, loop)
+
+        result = loop.run_until_complete(async_envelope.mark_as_dead_letter())
+
+        assert result == '1'
+
+    def test_mark_as_dead_letter_failure(self, loop):
+        dead_letter_future = concurrent.futures.Future()
+        dead_letter_future.set_exception(ConnectionResetError())
+        envelope = mock.Mock()
+        envelope.mark_as_dead_letter.return_value = dead_letter_future
+        async_envelope = aio.AsyncEnvelope(envelope, loop)
+
+        with pytest.raises(ConnectionResetError):
+            loop.run_until_complete(async_envelope.mark_as_dead_letter())
@@ -0,0 +1,132 @@
+import concurrent.futures
+from unittest import mock
+
+from google.api_core import exceptions as google_api_exceptions
+import marshmallow
+import pytest
+from marshmallow import fields
+
+import queue_messaging
+from queue_messaging import coalescing
+from queue_messaging import messaging
+from queue_messaging import publishing
+
+
+class PresenceSchema(marshmallow.Schema):
+    mac = fields.String(required=True)
+    online = fields.Boolean(required=True)
+
+
+class Presence(queue_messaging.Model):
+    class Meta:
+        schema = PresenceSchema
+        type_name = 'Presence'
+        coalesce_key = 'mac'
+
+
+class Plain(queue_messaging.Model):
+    class Meta:
+        schema = PresenceSchema
+        type_name = 'Plain'
+
+
+class ManualScheduler:
+    def __init__(self):
+        self.calls = []
+
+    def schedule(self, delay, function):
+        self.calls.append((delay, function))
+
+    def run(self):
+        calls, self.calls = self.calls, []
+        for _, function in calls:
+            function()
+
+
+@pytest.fixture
+def scheduler():
+    return ManualScheduler()
+
+
+@pytest.fixture
+def publish():
+    def publish(model):
+        future = concurrent.futures.Future()
+        future.set_result('id-{}'.format(model.online))
+        return future
+    return mock.Mock(side_effect=publish)
+
+
+def test_get_key():
+    assert coalescing.get_key(Presence(mac='a', online=True)) == ('Presence', 'a')
+    assert coalescing.get_key(Plain(mac='a', online=True)) is None
+
+
+class TestCoalescer:
+    def test_if_publishes_latest_model_per_key(self, scheduler, publish):
+        coalescer = coalescing.Coalescer(5, publish, scheduler)
+        first = coalescer.add('a', Presence(mac='a', online=True))
+        second = coalescer.add('a', Presence(mac='a', online=False))
+        other = coalescer.add('b', Presence(mac='b', online=True))
+        assert [delay for delay, _ in scheduler.calls] == [5, 5]
+        assert not first.done()
+        scheduler.run()
+        assert publish.call_args_list == [
+            mock.call(Presence(mac='a', online=False)),
+            mock.call(Presence(mac='b', online=True)),
+        ]
+        assert first.result(timeout=1) == second.result(timeout=1) == 'id-False'
+        assert other.result(timeout=1) == 'id-True'
+
+    def test_flush(self, scheduler, publish):
+        coalescer = coalescing.Coalescer(5, publish, scheduler)
+        future = coalescer.add('a', Presence(mac='a', online=True))
+        coalescer.flush()
+        assert future.result(timeout=1) == 'id-True'
+        scheduler.run()
+        assert publish.call_count == 1
+
+    def test_if_publish_error_fails_all_futures(self, scheduler):
+        coalescer = coalescing.Coalescer(5, mock.Mock(side_effect=ValueError), scheduler)
+        futures = [coalescer.add('a', Presence(mac='a', online=True)) for _ in range(2)]
+        scheduler.run()
+        assert all(isinstance(future.exception(timeout=1), ValueError) for future in futures)
+
+
+class TestMessagingCoalescing:
+    def test_if_only_models_with_key_are_coalesced(self):
+        client = mock.Mock()
+        client.send.return_value.result.return_value = 'id'
+        client.send.return_value.add_done_callback.side_effect = lambda callback: callback(
+            client.send.return_value)
+        messaging_instance = messaging.Messaging(
+            client, mock.Mock(), {}, coalesce_window=60)
+        messaging_instance.send(Plain(mac='a', online=True))
+        messaging_instance.send(Presence(mac='a', online=True))
+        messaging_instance.send(Presence(mac='a', online=False))
+        assert client.send.call_count == 1
+        messaging_instance.flush(timeout=0)
+        assert client.send.call_count == 2
+        assert b'false' in client.send.call_args[1]['message']
+
+    def test_if_blocked_publish_does_not_stop_retries(self):
+        first_attempt = concurrent.futures.Future()
+        first_attempt.set_exception(google_api_exceptions.ServiceUnavailable(''))
+
+        def send(message, **attributes):
+            if client.send.call_count == 1:
+                return first_attempt
+            future = concurrent.futures.Future()
+            future.set_result('id')
+            return future
+
+        client = mock.Mock()
+        client.send.side_effect = send
+        flow_controller = publishing.FlowController(max_messages=1)
+        messaging_instance = messaging.Messaging(
+            client, mock.Mock(), {}, coalesce_window=0.01,
+            publish_flow_controller=flow_controller)
+        first = messaging_instance.send(Presence(mac='a', online=True))
+        second = messaging_instance.send(Presence(mac='b', online=True))
+        assert first.result(timeout=5) == 'id'
+        assert second.result(timeout=5) == 'id'
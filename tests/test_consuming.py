@@ -0,0 +1,46 @@
+import os
+from unittest import mock
+
+import pytest
+
+from queue_messaging import consuming
+
+
+def double(value):
+    if value == 0:
+        os._exit(1)
+    if value < 0:
+        raise ValueError(value)
+    return value * 2
+
+
+@pytest.fixture
+def process_pool_handler():
+    handler = consuming.ProcessPoolHandler(double, processes=1)
+    yield handler
+    handler.shutdown()
+
+
+class TestProcessPoolHandler:
+    def test_if_acknowledges_handled_message(self, process_pool_handler):
+        envelope = mock.Mock(model=2)
+        process_pool_handler(envelope)
+        assert envelope.acknowledge.called
+        assert not envelope.reject.called
+
+    def test_if_rejects_failed_message(self, process_pool_handler):
+        envelope = mock.Mock(model=-1)
+        process_pool_handler(envelope)
+        assert envelope.reject.called
+        assert not envelope.acknowledge.called
+
+    def test_if_nacks_message_and_replaces_broken_pool(self, process_pool_handler):
+        envelope = mock.Mock(model=0)
+        process_pool_handler(envelope)
+        assert envelope.nack.called
+        assert not envelope.reject.called
+        assert not envelope.acknowledge.called
+
+        envelope = mock.Mock(model=2)
+        process_pool_handler(envelope)
+        assert envelope.acknowledge.called
@@ -0,0 +1,94 @@
+import concurrent.futures
+from unittest import mock
+
+import pytest
+
+from queue_messaging import dead_letter
+from queue_messaging import exceptions
+from queue_messaging import retrying
+from queue_messaging.data import structures
+
+
+@pytest.fixture
+def pulled_message():
+    return structures.PulledMessage(
+        ack=mock.Mock(), data=b'data', message_id='1', attributes={'type': 'FancyEvent'})
+
+
+@pytest.fixture
+def publish_future():
+    return concurrent.futures.Future()
+
+
+@pytest.fixture
+def client(publish_future):
+    client = mock.Mock()
+    client.send.return_value = publish_future
+    return client
+
+
+class TestDeadLetterQueue:
+    def test_if_acknowledges_after_publish(self, client, publish_future, pulled_message):
+        queue = dead_letter.DeadLetterQueue(client)
+
+        future = queue.send(pulled_message)
+
+        client.send.assert_called_with(message=b'data', type='FancyEvent')
+        assert not pulled_message.ack.called
+        publish_future.set_result('2')
+        assert future.result(timeout=1) == '2'
+        assert pulled_message.ack.called
+
+    def test_if_failed_publish_is_not_acknowledged(self, client, publish_future, pulled_message):
+        queue = dead_letter.DeadLetterQueue(client)
+
+        future = queue.send(pulled_message)
+        publish_future.set_exception(ValueError())
+
+        with pytest.raises(exceptions.QueueMessagingError):
+            future.result(timeout=1)
+        assert not pulled_message.ack.called
+
+    def test_if_failed_publish_nacks_message(self, client, publish_future, pulled_message):
+        pulled_message = pulled_message._replace(nack=mock.Mock())
+        queue = dead_letter.DeadLetterQueue(client)
+
+        future = queue.send(pulled_message)
+        publish_future.set_exception(ValueError())
+
+        assert future.exception(timeout=1) is not None
+        pulled_message.nack.assert_called_once_with()
+        assert not pulled_message.ack.called
+
+    def test_if_failed_publish_is_retried(self, client, pulled_message):
+        failed = concurrent.futures.Future()
+        failed.set_exception(ConnectionResetError())
+        succeeded = concurrent.futures.Future()
+        succeeded.set_result('2')
+        client.send.side_effect = [failed, succeeded]
+        scheduler = mock.Mock()
+        scheduler.schedule.side_effect = lambda delay, function: function()
+        queue = dead_letter.DeadLetterQueue(client, retry=retrying.Retrying(scheduler=scheduler))
+
+        assert queue.send(pulled_message).result(timeout=1) == '2'
+        assert client.send.call_count == 2
+        assert pulled_message.ack.called
+
+    def test_if_client_error_is_wrapped(self, client, pulled_message):
+        client.send.side_effect = exceptions.PubSubError()
+        queue = dead_letter.DeadLetterQueue(client, max_in_flight=1)
+
+        with pytest.raises(exceptions.QueueMessagingError):
+            queue.send(pulled_message)
+        with pytest.raises(exceptions.QueueMessagingError):
+            queue.send(pulled_message)
+
+    def test_if_in_flight_publishes_are_bounded(self, client, publish_future, pulled_message):
+        queue = dead_letter.DeadLetterQueue(client, max_in_flight=1)
+        queue.send(pulled_message)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            blocked = executor.submit(queue.send, pulled_message)
+            with pytest.raises(concurrent.futures.TimeoutError):
+                blocked.result(timeout=0.05)
+            publish_future.set_result('2')
+            assert blocked.result(timeout=1).done()
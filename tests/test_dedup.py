@@ -0,0 +1,77 @@
+from unittest import mock
+
+from queue_messaging import dedup
+from queue_messaging.data import structures
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMemoryCache:
+    def test_if_remembers_ids(self):
+        cache = dedup.MemoryCache()
+        cache.add('1')
+        assert '1' in cache
+        assert '2' not in cache
+
+    def test_if_ids_expire(self):
+        clock = Clock()
+        cache = dedup.MemoryCache(ttl=10, clock=clock)
+        cache.add('1')
+        clock.now = 10
+        assert '1' not in cache
+        assert len(cache) == 0
+
+    def test_if_least_recently_used_id_is_evicted(self):
+        cache = dedup.MemoryCache(max_size=2)
+        cache.add('1')
+        cache.add('2')
+        assert '1' in cache
+        cache.add('3')
+        assert '1' in cache
+        assert '2' not in cache
+
+
+class TestSQLiteStore:
+    def test_if_ids_are_shared(self, tmp_path):
+        path = str(tmp_path / 'dedup.sqlite')
+        store = dedup.SQLiteStore(path)
+        store.add('1')
+        other_store = dedup.SQLiteStore(path)
+        assert '1' in other_store
+        assert '2' not in other_store
+        store.close()
+        other_store.close()
+
+    def test_if_ids_expire(self, tmp_path):
+        clock = Clock()
+        store = dedup.SQLiteStore(str(tmp_path / 'dedup.sqlite'), ttl=10, clock=clock)
+        store.add('1')
+        clock.now = 10
+        assert '1' not in store
+        store.close()
+
+
+class TestDeduplicator:
+    def test_if_acknowledged_message_is_duplicate(self):
+        deduplicator = dedup.Deduplicator()
+        ack = mock.Mock()
+        pulled_message = deduplicator.track(structures.PulledMessage(
+            ack=ack, data=b'{}', message_id='1', attributes={}))
+        assert not deduplicator.is_duplicate('1')
+        pulled_message.ack()
+        ack.assert_called_once_with()
+        assert deduplicator.is_duplicate('1')
+        assert deduplicator.stats == {'hits': 1, 'misses': 1}
+
+    def test_if_store_hits_are_cached(self):
+        store = {'1'}
+        deduplicator = dedup.Deduplicator(store=store)
+        assert deduplicator.is_duplicate('1')
+        store.clear()
+        assert deduplicator.is_duplicate('1')
@@ -0,0 +1,99 @@
+from unittest import mock
+
+import marshmallow
+import pytest
+from marshmallow import fields
+
+import queue_messaging
+from queue_messaging import dispatching
+from queue_messaging import exceptions
+from queue_messaging.data import structures
+
+
+class FancyEventSchema(marshmallow.Schema):
+    uuid_field = fields.UUID(required=True)
+
+
+class FancyEvent(queue_messaging.Model):
+    class Meta:
+        schema = FancyEventSchema
+        type_name = 'FancyEvent'
+
+
+class OtherFancyEvent(queue_messaging.Model):
+    class Meta:
+        schema = FancyEventSchema
+        type_name = 'FancyEvent'
+
+
+def envelope_factory(type_name):
+    envelope = mock.Mock()
+    envelope.header = structures.Header(type=type_name, timestamp=None)
+    return envelope
+
+
+class TestDispatcher:
+    def test_dispatching_to_handler(self):
+        type_to_model = {}
+        dispatcher = dispatching.Dispatcher(type_to_model)
+        handler = mock.Mock()
+        dispatcher.on(FancyEvent)(handler)
+        envelope = envelope_factory('FancyEvent')
+
+        dispatcher(envelope)
+
+        handler.assert_called_with(envelope)
+        assert type_to_model == {'FancyEvent': FancyEvent}
+
+    def test_if_unhandled_message_is_acknowledged(self):
+        dispatcher = dispatching.Dispatcher({})
+        envelope = envelope_factory('FancyEvent')
+
+        dispatcher(envelope)
+
+        assert envelope.acknowledge.called
+        assert not envelope.mark_as_dead_letter.called
+
+    def test_if_unhandled_message_is_dead_lettered(self):
+        dispatcher = dispatching.Dispatcher({}, unhandled_policy=dispatching.DEAD_LETTER)
+        envelope = envelope_factory('FancyEvent')
+
+        dispatcher(envelope)
+
+        assert envelope.mark_as_dead_letter.called
+
+    def test_if_message_with_invalid_header_is_rejected(self):
+        dispatcher = dispatching.Dispatcher({})
+        dispatcher.on(FancyEvent)(mock.Mock())
+        envelope = mock.Mock()
+        type(envelope).header = mock.PropertyMock(side_effect=exceptions.DecodingError)
+
+        dispatcher(envelope)
+
+        assert envelope.reject.called
+        assert not envelope.acknowledge.called
+
+    def test_if_conflicting_model_raises_exception(self):
+        dispatcher = dispatching.Dispatcher({'FancyEvent': FancyEvent})
+        with pytest.raises(exceptions.ConfigurationError):
+            dispatcher.on(OtherFancyEvent)
+
+    def test_unknown_policy(self):
+        with pytest.raises(exceptions.ConfigurationError):
+            dispatching.Dispatcher({}, unhandled_policy='ignore')
+
+
+def test_messaging_dispatch():
+    client = mock.Mock()
+    client.receive.side_effect = lambda callback: callback(structures.PulledMessage(
+        ack=mock.Mock(), data=b'{"uuid_field": "cd1d3a03-7b04-4a35-97f8-ee5f3eb04c8e"}',
+        message_id='1', attributes={
+            'type': 'FancyEvent', 'timestamp': '2016-12-10T11:15:45.123456Z'}))
+    messaging = queue_messaging.Messaging(client, mock.Mock(), {})
+    handler = mock.Mock()
+    messaging.on(FancyEvent)(handler)
+
+    messaging.dispatch()
+
+    envelope = handler.call_args[0][0]
+    assert str(envelope.model.uuid_field) == 'cd1d3a03-7b04-4a35-97f8-ee5f3eb04c8e'
@@ -8,6 +8,7 @@ from marshmallow import fields
 
 import queue_messaging
 from queue_messaging import test_utils
+from queue_messaging.data import structures
 
 
 class FancyEventSchema(marshmallow.Schema):
@@ -69,10 +70,70 @@ def test_send(header_timestamp_mock, pubsub_publisher_client_mock, topic_path_mo
             "string_field": "Just testing!"
         }),
         timestamp='2016-12-10T11:15:45.123456Z',
-        type='FancyEvent'
+        type='FancyEvent',
+        content_type='application/json',
+        retry=None,
     )
 
 
+def test_send_many(header_timestamp_mock, pubsub_publisher_client_mock, topic_path_mock):
+    topic_path_mock.return_value = 'projects/p-id/topics/test-topic'
+    messaging = queue_messaging.Messaging.create_from_dict({
+        'TOPIC': 'test-topic',
+        'PROJECT_ID': 'p-id',
+        'PUBLISH_BATCH_MAX_MESSAGES': 500,
+    })
+    models = [
+        FancyEvent(uuid_field=uuid.UUID('cd1d3a03-7b04-4a35-97f8-ee5f3eb04c8e')),
+        FancyEvent(uuid_field=uuid.UUID('72d9a041-f401-42b6-8556-72b3c00e43d8')),
+    ]
+    header_timestamp_mock.return_value = datetime.datetime(
+        2016, 12, 10, 11, 15, 45, 123456, tzinfo=datetime.timezone.utc)
+
+    messaging.send_many(models)
+
+    batch_settings = pubsub_publisher_client_mock.call_args[1]['batch_settings']
+    assert batch_settings.max_messages == 500
+    publish_mock = pubsub_publisher_client_mock.return_value.publish
+    assert publish_mock.call_count == 2
+    publish_mock.assert_called_with(
+        'projects/p-id/topics/test-topic',
+        test_utils.EncodedJson({
+            "uuid_field": "72d9a041-f401-42b6-8556-72b3c00e43d8",
+            "string_field": None,
+        }),
+        timestamp='2016-12-10T11:15:45.123456Z',
+        type='FancyEvent',
+        content_type='application/json',
+        retry=None,
+    )
+
+
+def test_send_and_receive_compressed(pubsub_publisher_client_mock, topic_path_mock):
+    messaging = queue_messaging.Messaging.create_from_dict({
+        'TOPIC': 'test-topic',
+        'PROJECT_ID': 'p-id',
+        'MESSAGE_TYPES': [
+            FancyEvent,
+        ],
+        'COMPRESSION': 'zlib',
+        'COMPRESSION_THRESHOLD': 10,
+    })
+    model = FancyEvent(
+        uuid_field=uuid.UUID('cd1d3a03-7b04-4a35-97f8-ee5f3eb04c8e'),
+        string_field='Just testing!' * 10
+    )
+
+    messaging.send(model)
+
+    publish_mock = pubsub_publisher_client_mock.return_value.publish
+    (_, data), attributes = publish_mock.call_args
+    assert attributes['content_encoding'] == 'zlib'
+    envelope = messaging._wrap_in_envelope(structures.PulledMessage(
+        ack=mock.Mock(), data=data, message_id='1', attributes=attributes))
+    assert envelope.model == model
+
+
 def test_receive(pubsub_client_mock):
     messaging = queue_messaging.Messaging.create_from_dict({
         'SUBSCRIPTION': 'test-subscription',
@@ -85,3 +146,18 @@ def test_receive(pubsub_client_mock):
 
     messaging.receive(callback=mock.MagicMock())
     assert subscription_mock.called
+
+
+def test_round_trip_through_memory_backend():
+    messaging = queue_messaging.Messaging.create_from_dict({
+        'BACKEND': 'memory',
+        'TOPIC': 'memory-topic-{}'.format(uuid.uuid4()),
+        'SUBSCRIPTION': 'memory-subscription-{}'.format(uuid.uuid4()),
+        'MESSAGE_TYPES': [FancyEvent],
+    })
+    model = FancyEvent(uuid_field=uuid.uuid4(), string_field='Just testing!')
+    messaging.send(model).result(timeout=1)
+    envelopes = messaging.pull(10, timeout=1)
+    assert [envelope.model for envelope in envelopes] == [model]
+    envelopes[0].acknowledge()
+    assert messaging.pull(10, timeout=0) == []
@@ -0,0 +1,168 @@
+from unittest import mock
+
+import marshmallow
+import pytest
+from marshmallow import fields
+
+import queue_messaging
+from queue_messaging import dedup
+from queue_messaging import messaging
+from queue_messaging import outbox
+from queue_messaging.data import structures
+
+
+class FancyEventSchema(marshmallow.Schema):
+    string_field = fields.String(required=True)
+
+
+class FancyEvent(queue_messaging.Model):
+    class Meta:
+        schema = FancyEventSchema
+        type_name = 'FancyEvent'
+
+
+def pulled_message_factory(ack_id, data):
+    return structures.PulledMessage(
+        ack=mock.Mock(), data=data, message_id=ack_id,
+        attributes={'type': 'FancyEvent', 'timestamp': '2016-12-10T11:15:45.123456Z'},
+        ack_id=ack_id)
+
+
+@pytest.fixture
+def pulled_message():
+    return structures.PulledMessage(
+        ack=mock.Mock(), data=b'{}', message_id='1',
+        attributes={'type': 'FancyEvent', 'timestamp': '2016-12-10T11:15:45.123456Z'},
+        nack=mock.Mock(), modify_ack_deadline=mock.Mock())
+
+
+@pytest.fixture
+def envelope(pulled_message):
+    return messaging.Envelope(
+        pulled_message=pulled_message, client=mock.Mock(),
+        dead_letter_client=mock.Mock(), type_to_model={})
+
+
+class TestEnvelope:
+    def test_acknowledge(self, envelope, pulled_message):
+        envelope.acknowledge()
+        assert pulled_message.ack.called
+
+    def test_nack(self, envelope, pulled_message):
+        envelope.nack()
+        assert pulled_message.nack.called
+
+    def test_extend(self, envelope, pulled_message):
+        envelope.extend(600)
+        pulled_message.modify_ack_deadline.assert_called_with(600)
+
+    def test_has_dead_letter_topic(self, pulled_message):
+        envelope = messaging.Envelope(
+            pulled_message=pulled_message, client=mock.Mock(),
+            dead_letter_client=mock.Mock(topic_name=None), type_to_model={})
+        assert not envelope.has_dead_letter_topic
+
+    def test_reject(self, pulled_message):
+        dead_letter_queue = mock.Mock()
+        envelope = messaging.Envelope(
+            pulled_message=pulled_message, client=mock.Mock(), dead_letter_client=mock.Mock(),
+            type_to_model={}, dead_letter_queue=dead_letter_queue)
+        envelope.reject()
+        dead_letter_queue.send.assert_called_with(pulled_message)
+        assert not pulled_message.nack.called
+
+    def test_reject_without_dead_letter_topic(self, pulled_message):
+        envelope = messaging.Envelope(
+            pulled_message=pulled_message, client=mock.Mock(),
+            dead_letter_client=mock.Mock(topic_name=None), type_to_model={})
+        envelope.reject()
+        assert pulled_message.nack.called
+
+
+class StopReceiving(Exception):
+    pass
+
+
+class TestBatches:
+    @pytest.fixture
+    def client(self):
+        return mock.Mock()
+
+    @pytest.fixture
+    def dead_letter_client(self):
+        return mock.Mock()
+
+    @pytest.fixture
+    def messaging(self, client, dead_letter_client):
+        return queue_messaging.Messaging(client, dead_letter_client, {'FancyEvent': FancyEvent})
+
+    def test_pull(self, messaging, client):
+        client.pull.return_value = [pulled_message_factory('1', b'{"string_field": "a"}')]
+        envelopes = messaging.pull(10, timeout=1)
+        client.pull.assert_called_with(10, timeout=1)
+        assert envelopes[0].model == FancyEvent(string_field='a')
+
+    def test_receive_batches(self, messaging, client):
+        client.pull.side_effect = [
+            [pulled_message_factory('1', b'{"string_field": "a"}')],
+            [pulled_message_factory('2', b'{"string_field": "b"}')],
+        ]
+        handler = mock.Mock(side_effect=StopReceiving)
+
+        with pytest.raises(StopReceiving):
+            messaging.receive_batches(handler, batch_size=2, max_wait=10)
+
+        handler.assert_called_with([FancyEvent(string_field='a'), FancyEvent(string_field='b')])
+        assert client.pull.call_args_list == [mock.call(2, timeout=mock.ANY), mock.call(1, timeout=mock.ANY)]
+        assert not client.acknowledge.called
+
+    def test_if_batch_is_acknowledged_together(self, messaging, client):
+        client.pull.return_value = [
+            pulled_message_factory('1', b'{"string_field": "a"}'),
+            pulled_message_factory('2', b'{"string_field": "b"}'),
+        ]
+        messaging._handle_batch(mock.Mock(), messaging.pull(2))
+        client.acknowledge.assert_called_once_with(['1', '2'])
+
+    def test_if_invalid_messages_are_dead_lettered(self, messaging, client, dead_letter_client):
+        client.pull.return_value = [
+            pulled_message_factory('1', b'{"string_field": "a"}'),
+            pulled_message_factory('2', b'invalid'),
+        ]
+        handler = mock.Mock()
+        messaging._handle_batch(handler, messaging.pull(2))
+        handler.assert_called_once_with([FancyEvent(string_field='a')])
+        assert dead_letter_client.send.call_args[1]['message'] == b'invalid'
+        client.acknowledge.assert_called_once_with(['1'])
+
+    def test_if_invalid_messages_are_nacked_without_dead_letter_topic(
+            self, messaging, client, dead_letter_client):
+        dead_letter_client.topic_name = None
+        invalid_message = pulled_message_factory('2', b'invalid')._replace(nack=mock.Mock())
+        client.pull.return_value = [invalid_message]
+        messaging._handle_batch(mock.Mock(), messaging.pull(1))
+        assert invalid_message.nack.called
+        assert not dead_letter_client.send.called
+
+
+class TestDeduplication:
+    def test_if_redelivered_message_is_acknowledged_without_callback(self, pulled_message):
+        client = mock.Mock()
+        client.receive.side_effect = lambda callback: [callback(pulled_message) for _ in range(2)]
+        messaging_instance = messaging.Messaging(
+            client, mock.Mock(), {'FancyEvent': FancyEvent},
+            deduplicator=dedup.Deduplicator())
+        callback = mock.Mock(side_effect=lambda envelope: envelope.acknowledge())
+        messaging_instance.receive(callback)
+        assert callback.call_count == 1
+        assert pulled_message.ack.call_count == 2
+        assert messaging_instance.deduplicator.stats == {'hits': 1, 'misses': 1}
+
+
+class TestClose:
+    def test_if_close_stops_outbox_drainer(self, tmp_path):
+        message_outbox = outbox.Outbox(str(tmp_path / 'outbox.sqlite'))
+        messaging_instance = messaging.Messaging(
+            mock.Mock(), mock.Mock(), {}, outbox=message_outbox)
+        messaging_instance.close()
+        assert not message_outbox._thread.is_alive()
@@ -0,0 +1,165 @@
+import concurrent.futures
+import sqlite3
+import threading
+from unittest import mock
+
+import pytest
+
+from queue_messaging import outbox as outbox_module
+from queue_messaging import publishing
+from queue_messaging import retrying
+
+
+def resolved(result):
+    future = concurrent.futures.Future()
+    future.set_result(result)
+    return future
+
+
+def failed(error):
+    future = concurrent.futures.Future()
+    future.set_exception(error)
+    return future
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    outbox = outbox_module.Outbox(str(tmp_path / 'outbox.sqlite'), batch_size=2)
+    yield outbox
+    outbox.close()
+
+
+class TestOutbox:
+    def test_if_keeps_messages_in_order(self, outbox):
+        outbox.put(b'1', {'type': 'FancyEvent'})
+        outbox.put('2', {})
+        assert len(outbox) == 2
+        assert [entry[1:] for entry in outbox.peek(10)] == [
+            (b'1', {'type': 'FancyEvent'}), (b'2', {})]
+
+    def test_if_messages_survive_reopening(self, outbox):
+        outbox.put(b'1', {})
+        reopened = outbox_module.Outbox(outbox.path)
+        assert len(reopened) == 1
+        reopened.close()
+
+    def test_if_outbox_without_claims_is_upgraded(self, tmp_path):
+        path = str(tmp_path / 'old.sqlite')
+        connection = sqlite3.connect(path)
+        connection.execute(
+            'CREATE TABLE outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, '
+            'message BLOB NOT NULL, attributes TEXT NOT NULL)')
+        connection.execute("INSERT INTO outbox (message, attributes) VALUES (x'31', '{}')")
+        connection.commit()
+        connection.close()
+        outbox = outbox_module.Outbox(path)
+        assert [entry[1] for entry in outbox.claim(10)] == [b'1']
+        outbox.close()
+
+    def test_drain_publishes_batch(self, outbox):
+        for message in (b'1', b'2', b'3'):
+            outbox.put(message, {'type': 'FancyEvent'})
+        send = mock.Mock(return_value=resolved('id'))
+        assert outbox.drain(send)
+        assert send.call_args_list == [
+            mock.call(b'1', type='FancyEvent'), mock.call(b'2', type='FancyEvent')]
+        assert [entry[1] for entry in outbox.peek(10)] == [b'3']
+
+    def test_drain_keeps_failed_and_later_messages(self, outbox):
+        outbox.put(b'1', {})
+        outbox.put(b'2', {})
+        send = mock.Mock(side_effect=[failed(ConnectionResetError()), resolved('id')])
+        assert not outbox.drain(send)
+        assert [entry[1] for entry in outbox.peek(10)] == [b'1', b'2']
+
+    def test_drain_keeps_messages_with_publish_timeout(self, outbox):
+        outbox.put(b'1', {})
+        outbox.publish_timeout = 0.01
+        send = mock.Mock(return_value=concurrent.futures.Future())
+        assert not outbox.drain(send, lambda error: False)
+        assert len(outbox) == 1
+
+    def test_if_claimed_messages_are_not_drained_twice(self, outbox):
+        outbox.put(b'1', {})
+        other = outbox_module.Outbox(outbox.path)
+        claimed = outbox.claim(10)
+        send = mock.Mock()
+        assert not other.drain(send)
+        assert not send.called
+        outbox.release([row_id for row_id, _, _ in claimed])
+        send.return_value = resolved('id')
+        assert other.drain(send)
+        assert len(outbox) == 0
+        other.close()
+
+    def test_if_expired_claim_is_taken_over(self, outbox):
+        outbox.put(b'1', {})
+        outbox.claim_timeout = -1
+        outbox.claim(10)
+        other = outbox_module.Outbox(outbox.path)
+        assert [entry[1] for entry in other.claim(10)] == [b'1']
+        other.close()
+
+    def test_if_length_includes_messages_of_other_outboxes(self, outbox):
+        other = outbox_module.Outbox(outbox.path)
+        other.put(b'1', {})
+        assert len(outbox) == 1
+        other.close()
+
+    def test_drain_drops_messages_failing_with_non_retryable_error(self, outbox):
+        outbox.put(b'1', {})
+        outbox.put(b'2', {})
+        send = mock.Mock(side_effect=[failed(ValueError()), failed(ConnectionResetError())])
+        is_retryable = lambda error: isinstance(error, ConnectionError)  # noqa: E731
+        assert not outbox.drain(send, is_retryable)
+        assert [entry[1] for entry in outbox.peek(10)] == [b'2']
+
+    def test_drain_drops_messages_rejected_synchronously(self, outbox):
+        outbox.put(b'1', {})
+        outbox.put(b'2', {})
+        send = mock.Mock(side_effect=[ValueError, resolved('id')])
+        assert outbox.drain(send, lambda error: False)
+        assert len(outbox) == 0
+
+    def test_drainer_empties_outbox(self, outbox):
+        outbox.put(b'1', {})
+        published = threading.Event()
+        outbox.start_draining(lambda message, **attributes: published.set())
+        assert published.wait(timeout=1)
+
+
+class TestPublisherWithOutbox:
+    @pytest.fixture
+    def client(self):
+        return mock.Mock()
+
+    def test_if_failed_publish_is_stored(self, client, outbox):
+        client.send.return_value = failed(ConnectionResetError())
+        retry = retrying.Retrying(policies=[(ConnectionError, retrying.Backoff(max_attempts=1))])
+        outbox.drain_interval = 60
+        publisher = publishing.Publisher(client, retry, outbox)
+        future = publisher.publish(b'data', {'type': 'FancyEvent'})
+        assert future.result(timeout=1) is None
+        assert [entry[1:] for entry in outbox.peek(10)] == [(b'data', {'type': 'FancyEvent'})]
+
+    def test_if_non_retryable_failure_is_not_stored(self, client, outbox):
+        client.send.return_value = failed(ValueError())
+        publisher = publishing.Publisher(client, retrying.Retrying(policies=()), outbox)
+        future = publisher.publish(b'data', {'type': 'FancyEvent'})
+        assert isinstance(future.exception(timeout=1), ValueError)
+        assert len(outbox) == 0
+
+    def test_if_messages_queue_behind_stored_ones(self, client, outbox):
+        outbox.put(b'1', {})
+        client.send.return_value = concurrent.futures.Future()
+        outbox.publish_timeout = 0.01
+        outbox.drain_interval = 60
+        publisher = publishing.Publisher(client, outbox=outbox)
+        assert publisher.publish(b'2', {}).result(timeout=1) is None
+        assert [entry[1] for entry in outbox.peek(10)] == [b'1', b'2']
+
+    def test_if_successful_publish_is_not_stored(self, client, outbox):
+        client.send.return_value = resolved('id')
+        publisher = publishing.Publisher(client, outbox=outbox)
+        assert publisher.publish(b'data', {}).result(timeout=1) == 'id'
+        assert len(outbox) == 0
@@ -0,0 +1,110 @@
+import concurrent.futures
+import threading
+from unittest import mock
+
+import pytest
+
+from queue_messaging import exceptions
+from queue_messaging import publishing
+from queue_messaging import retrying
+
+
+@pytest.fixture
+def client():
+    client = mock.Mock()
+    client.send.side_effect = lambda message, **attributes: concurrent.futures.Future()
+    return client
+
+
+class TestPublisher:
+    def test_publish(self, client):
+        publisher = publishing.Publisher(client)
+        future = publisher.publish(b'data', {'type': 'FancyEvent'})
+        client.send.assert_called_with(message=b'data', type='FancyEvent')
+        assert isinstance(future, concurrent.futures.Future)
+
+    def test_if_publish_retries_failed_publish(self, client):
+        scheduler = mock.Mock()
+        scheduler.schedule.side_effect = lambda delay, function: function()
+        failed = concurrent.futures.Future()
+        failed.set_exception(ConnectionResetError())
+        succeeded = concurrent.futures.Future()
+        succeeded.set_result('1')
+        client.send.side_effect = [failed, succeeded]
+        publisher = publishing.Publisher(client, retrying.Retrying(scheduler=scheduler))
+        future = publisher.publish(b'data', {})
+        assert future.result(timeout=1) == '1'
+        assert client.send.call_count == 2
+
+    def test_if_publish_wraps_client_errors(self, client):
+        client.send.side_effect = exceptions.PubSubError()
+        publisher = publishing.Publisher(client)
+        with pytest.raises(exceptions.QueueMessagingError):
+            publisher.publish(b'data', {})
+
+    def test_publish_many(self, client):
+        publisher = publishing.Publisher(client)
+        future = publisher.publish_many([(b'1', {}), (b'2', {})])
+        assert client.send.call_count == 2
+        assert not future.done()
+
+    def test_flush_waits_for_pending_messages(self, client):
+        publisher = publishing.Publisher(client)
+        pending = publisher.publish(b'data', {})
+        with pytest.raises(concurrent.futures.TimeoutError):
+            publisher.flush(timeout=0.01)
+        pending.set_result('1')
+        publisher.flush(timeout=1)
+
+    def test_flush_ignores_failed_messages(self, client):
+        publisher = publishing.Publisher(client)
+        pending = publisher.publish(b'data', {})
+        pending.set_exception(ConnectionResetError())
+        publisher.flush(timeout=1)
+
+
+class TestFlowController:
+    def test_if_limits_outstanding_messages(self, client):
+        flow_controller = publishing.FlowController(max_messages=1, overflow=publishing.RAISE)
+        publisher = publishing.Publisher(client, flow_controller=flow_controller)
+        pending = publisher.publish(b'1', {})
+        with pytest.raises(exceptions.PublisherOverflowError):
+            publisher.publish(b'2', {})
+        pending.set_result('1')
+        publisher.publish(b'2', {})
+
+    def test_if_limits_outstanding_bytes(self):
+        flow_controller = publishing.FlowController(max_bytes=5, overflow=publishing.RAISE)
+        assert flow_controller.acquire(3)
+        assert not flow_controller.acquire(3)
+        flow_controller.release(3)
+        assert flow_controller.acquire(10)
+
+    def test_if_blocks_until_publish_finishes(self):
+        flow_controller = publishing.FlowController(max_messages=1)
+        flow_controller.acquire(1)
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (flow_controller.acquire(1), acquired.set()))
+        thread.start()
+        assert not acquired.wait(timeout=0.01)
+        flow_controller.release(1)
+        assert acquired.wait(timeout=1)
+        thread.join()
+
+    def test_if_overflows_to_outbox(self, client):
+        outbox = mock.Mock()
+        outbox.__len__ = mock.Mock(return_value=0)
+        flow_controller = publishing.FlowController(max_messages=1, overflow=publishing.OUTBOX)
+        publisher = publishing.Publisher(client, outbox=outbox, flow_controller=flow_controller)
+        publisher.publish(b'1', {})
+        assert publisher.publish(b'2', {'type': 'FancyEvent'}).result(timeout=1) is None
+        outbox.put.assert_called_once_with(b'2', {'type': 'FancyEvent'})
+
+    def test_if_overflow_to_outbox_requires_outbox(self, client):
+        flow_controller = publishing.FlowController(overflow=publishing.OUTBOX)
+        with pytest.raises(exceptions.ConfigurationError):
+            publishing.Publisher(client, flow_controller=flow_controller)
+
+    def test_if_unknown_overflow_is_rejected(self):
+        with pytest.raises(exceptions.ConfigurationError):
+            publishing.FlowController(overflow='drop')
@@ -0,0 +1,117 @@
+import concurrent.futures
+from unittest import mock
+
+from google.api_core import exceptions as google_api_exceptions
+import pytest
+
+from queue_messaging import retrying
+
+
+class ImmediateScheduler:
+    def __init__(self):
+        self.delays = []
+
+    def schedule(self, delay, function):
+        self.delays.append(delay)
+        function()
+
+
+def resolved(result):
+    future = concurrent.futures.Future()
+    future.set_result(result)
+    return future
+
+
+def failed(error):
+    future = concurrent.futures.Future()
+    future.set_exception(error)
+    return future
+
+
+@pytest.fixture
+def scheduler():
+    return ImmediateScheduler()
+
+
+def create_retrying(scheduler, **kwargs):
+    return retrying.Retrying(scheduler=scheduler, random=lambda: 0, **kwargs)
+
+
+class TestRetrying:
+    def test_if_resolves_to_result(self, scheduler):
+        future = create_retrying(scheduler).call(lambda: resolved('1'))
+        assert future.result(timeout=1) == '1'
+        assert scheduler.delays == []
+
+    def test_if_retries_failed_future_with_backoff(self, scheduler):
+        function = mock.Mock(side_effect=[
+            failed(google_api_exceptions.ServiceUnavailable('')),
+            failed(google_api_exceptions.ServiceUnavailable('')),
+            resolved('1'),
+        ])
+        future = create_retrying(scheduler).call(function)
+        assert future.result(timeout=1) == '1'
+        assert function.call_count == 3
+        assert scheduler.delays == [0.1, 0.2]
+
+    def test_if_retries_synchronous_connection_errors(self, scheduler):
+        function = mock.Mock(side_effect=[ConnectionResetError, resolved('1')])
+        future = create_retrying(scheduler).call(function)
+        assert future.result(timeout=1) == '1'
+
+    def test_if_non_retryable_synchronous_error_is_raised(self, scheduler):
+        function = mock.Mock(side_effect=ValueError)
+        with pytest.raises(ValueError):
+            create_retrying(scheduler).call(function)
+
+    def test_if_non_retryable_error_fails_future(self, scheduler):
+        error = google_api_exceptions.PermissionDenied('')
+        future = create_retrying(scheduler).call(lambda: failed(error))
+        assert future.exception(timeout=1) is error
+        assert scheduler.delays == []
+
+    def test_if_gives_up_after_max_attempts(self, scheduler):
+        policies = [(ConnectionError, retrying.Backoff(max_attempts=3))]
+        function = mock.Mock(return_value=failed(ConnectionResetError()))
+        future = create_retrying(scheduler, policies=policies).call(function)
+        assert isinstance(future.exception(timeout=1), ConnectionResetError)
+        assert function.call_count == 3
+
+    def test_if_delay_is_capped(self):
+        backoff = retrying.Backoff(initial_delay=1, max_delay=5, multiplier=10, jitter=0)
+        assert retrying.Retrying().get_delay(backoff, 3) == 5
+
+    def test_if_jitter_shortens_delay(self):
+        backoff = retrying.Backoff(initial_delay=1, jitter=0.5)
+        retry = retrying.Retrying(random=lambda: 1)
+        assert retry.get_delay(backoff, 1) == 0.5
+
+    def test_if_throttling_uses_its_own_policy(self):
+        backoff = retrying.Retrying().get_backoff(google_api_exceptions.TooManyRequests(''))
+        assert backoff == retrying.THROTTLED_BACKOFF
+
+    def test_if_exhausted_budget_stops_retrying(self, scheduler):
+        budget = retrying.RetryBudget(ratio=0, min_retries=1)
+        function = mock.Mock(return_value=failed(ConnectionResetError()))
+        retry = create_retrying(scheduler, budget=budget)
+        assert isinstance(retry.call(function).exception(timeout=1), ConnectionResetError)
+        assert function.call_count == 2
+        assert isinstance(retry.call(function).exception(timeout=1), ConnectionResetError)
+        assert function.call_count == 3
+
+
+class TestRetryBudget:
+    def test_if_deposits_refill_budget(self):
+        budget = retrying.RetryBudget(ratio=0.5, min_retries=1)
+        assert budget.withdraw()
+        assert not budget.withdraw()
+        budget.deposit()
+        budget.deposit()
+        assert budget.withdraw()
+
+
+def test_create_retrying_applies_settings():
+    retry = retrying.create_retrying(max_attempts=2, initial_delay=0.5)
+    backoff = retry.get_backoff(ConnectionResetError())
+    assert backoff.max_attempts == 2
+    assert backoff.initial_delay == 0.5
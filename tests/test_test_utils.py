@@ -0,0 +1,8 @@
+from queue_messaging import test_utils
+
+
+def test_string_comparable_json():
+    expected = test_utils.StringComparableJson({'uuid_field': '1'})
+    assert expected == '{"uuid_field": "1"}'
+    assert expected == b'{"uuid_field": "1"}'
+    assert expected != b'{"uuid_field": "2"}'
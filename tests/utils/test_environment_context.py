@@ -0,0 +1,24 @@
+import os
+from unittest import mock
+
+from queue_messaging import utils
+
+
+class TestEnvironmentContext:
+    def test_if_sets_variable_temporarily(self):
+        with mock.patch.dict(os.environ, clear=True):
+            with utils.EnvironmentContext('KEY', 'value'):
+                assert os.environ['KEY'] == 'value'
+            assert 'KEY' not in os.environ
+
+    def test_if_restores_previous_value(self):
+        with mock.patch.dict(os.environ, {'KEY': 'old'}):
+            with utils.EnvironmentContext('KEY', 'value'):
+                assert os.environ['KEY'] == 'value'
+            assert os.environ['KEY'] == 'old'
+
+    def test_if_restores_empty_previous_value(self):
+        with mock.patch.dict(os.environ, {'KEY': ''}):
+            with utils.EnvironmentContext('KEY', 'value'):
+                pass
+            assert os.environ['KEY'] == ''
@@ -0,0 +1,35 @@
+import concurrent.futures
+
+import pytest
+
+from queue_messaging import utils
+
+
+def resolved(result):
+    future = concurrent.futures.Future()
+    future.set_result(result)
+    return future
+
+
+class TestAggregate:
+    def test_if_resolves_to_list_of_results(self):
+        future = utils.aggregate([resolved('1'), resolved('2')])
+        assert future.result(timeout=1) == ['1', '2']
+
+    def test_if_empty_aggregate_is_resolved(self):
+        future = utils.aggregate([])
+        assert future.result(timeout=1) == []
+
+    def test_if_waits_for_all_futures(self):
+        pending = concurrent.futures.Future()
+        future = utils.aggregate([resolved('1'), pending])
+        assert not future.done()
+        pending.set_result('2')
+        assert future.result(timeout=1) == ['1', '2']
+
+    def test_if_fails_when_any_future_fails(self):
+        failed = concurrent.futures.Future()
+        failed.set_exception(ConnectionResetError())
+        future = utils.aggregate([resolved('1'), failed])
+        with pytest.raises(ConnectionResetError):
+            future.result(timeout=1)
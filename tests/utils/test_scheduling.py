@@ -0,0 +1,21 @@
+import threading
+
+from queue_messaging import utils
+
+
+class TestScheduler:
+    def test_if_calls_are_run_in_order_of_delay(self):
+        scheduler = utils.Scheduler()
+        calls = []
+        done = threading.Event()
+        scheduler.schedule(0.02, lambda: (calls.append('late'), done.set()))
+        scheduler.schedule(0, lambda: calls.append('early'))
+        assert done.wait(timeout=1)
+        assert calls == ['early', 'late']
+
+    def test_if_failing_call_does_not_stop_scheduler(self):
+        scheduler = utils.Scheduler()
+        done = threading.Event()
+        scheduler.schedule(0, lambda: 1 / 0)
+        scheduler.schedule(0, done.set)
+        assert done.wait(timeout=1)